@@ -17,34 +17,89 @@ Features:
 - Automated reporting
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, g, has_request_context, make_response, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
 import sqlite3
 import qrcode
 import io
 import base64
 import json
+import hashlib
 import os
-from functools import wraps
+import threading
+from functools import partial, wraps
 import logging
 from app.modules.database_manager import DatabaseManager
 from app.modules.qr_generator import QRGenerator
 from app.modules.attendance_manager import AttendanceManager
 from app.modules.report_generator import ReportGenerator
 from app.modules.notification_system import NotificationSystem
-from app.modules.auth_manager import AuthManager
+from app.modules.auth_manager import AuthManager, PasswordCheckUnavailable
 from app.modules.room_manager import RoomManager
 from app.modules.student_manager import StudentManager
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; falls back to Flask's encoders for other types"""
+    
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+               if ORJSON_AVAILABLE else 0)
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype
+        )
+
 # Initialize Flask application with correct template and static folders
 app = Flask(__name__, 
             template_folder='app/templates',
             static_folder='app/static')
-app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-app.config['DATABASE_URL'] = 'database/attendance.db'
+# Deployment-specific settings come from the environment so the same code
+# serves development and preforked production workers
+app.config.from_mapping(
+    SECRET_KEY=os.environ.get('SECRET_KEY') or 'your-secret-key-change-this-in-production',
+    DATABASE_URL=os.environ.get('DATABASE_PATH') or 'database/attendance.db'
+)
+app.config['DATABASE_CONNECTION_POOL_SIZE'] = 20
 app.config['UPLOAD_FOLDER'] = 'exports'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')  # Enables pub/sub notification fan-out
+app.config['GENERATED_PAGES_DIR'] = os.path.join(app.static_folder, '_gen')
+app.config['JINJA_CACHE_DIR'] = os.environ.get('JINJA_CACHE_DIR') or os.path.join(app.root_path, '.jinja_cache')
+app.config['ATTENDANCE_WRITE_BEHIND'] = os.environ.get('ATTENDANCE_WRITE_BEHIND', 'False').lower() in ['true', 'on', '1']
+
+# Serialize API responses with orjson when available
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 
 # Configure logging
 logging.basicConfig(
@@ -53,15 +108,137 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize system components
-db_manager = DatabaseManager(app.config['DATABASE_URL'])
-qr_generator = QRGenerator()
-attendance_manager = AttendanceManager(db_manager)
-report_generator = ReportGenerator(db_manager)
-notification_system = NotificationSystem()
-auth_manager = AuthManager(db_manager)
-room_manager = RoomManager(db_manager)
-student_manager = StudentManager(db_manager)
+if 'SECRET_KEY' not in os.environ:
+    logger.warning("SECRET_KEY is not set; using the insecure development key")
+
+# In-process cache for hot read-only aggregates
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+# Persist compiled templates so restarted workers skip re-parsing them
+os.makedirs(app.config['JINJA_CACHE_DIR'], exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_CACHE_DIR'])
+
+# Gzip/Brotli responses when Flask-Compress is installed
+if COMPRESS_AVAILABLE:
+    Compress(app)
+
+def request_cached(f):
+    """Decorator to memoize a read-only call for the lifetime of the current request"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not has_request_context():
+            return f(*args, **kwargs)
+        
+        if '_cache' not in g:
+            g._cache = {}
+        
+        key = (f.__qualname__, args, tuple(sorted(kwargs.items())))
+        if key not in g._cache:
+            g._cache[key] = f(*args, **kwargs)
+        return g._cache[key]
+    return decorated_function
+
+def init_managers(app):
+    """
+    Construct the system components and register them in app.extensions.
+    
+    Args:
+        app (Flask): Application to attach the components to
+    
+    Returns:
+        dict: Components keyed by name
+    """
+    db_manager = DatabaseManager(app.config['DATABASE_URL'],
+                                 pool_size=app.config['DATABASE_CONNECTION_POOL_SIZE'])
+    redis_client = None
+    if REDIS_AVAILABLE and app.config['REDIS_URL']:
+        redis_pool = redis.ConnectionPool.from_url(app.config['REDIS_URL'])
+        redis_client = redis.Redis(connection_pool=redis_pool)
+    
+    attendance_manager = AttendanceManager(db_manager)
+    notification_system = NotificationSystem()
+    # Sessions and login lockouts are shared across workers through Redis
+    auth_manager = AuthManager(db_manager, redis_client)
+    # Edits and deactivations drop the scan path's cached lookups right away
+    room_manager = RoomManager(db_manager, on_room_changed=attendance_manager.invalidate_room)
+    student_manager = StudentManager(db_manager, on_student_changed=attendance_manager.invalidate_student)
+    
+    # Keep the WAL file from growing between SQLite's automatic checkpoints
+    db_manager.enable_wal_checkpoints()
+    
+    # Keep security audit logging off the login request path
+    auth_manager.enable_audit_queue()
+    
+    # Batch scan inserts on a background writer to amortize commits during bursts
+    if app.config['ATTENDANCE_WRITE_BEHIND']:
+        attendance_manager.enable_write_behind()
+    
+    # Publish scan notifications through Redis when configured so the request
+    # only waits on a single PUBLISH instead of notification delivery
+    if redis_client:
+        notification_system.start_redis_listener(redis_client, 'attendance')
+    
+    # Counts read more than once while building the same page
+    student_manager.get_student_count = request_cached(student_manager.get_student_count)
+    room_manager.get_room_count = request_cached(room_manager.get_room_count)
+    auth_manager.get_professor_count = request_cached(auth_manager.get_professor_count)
+    attendance_manager.get_today_attendance_summary = request_cached(attendance_manager.get_today_attendance_summary)
+    
+    app.extensions['scanme'] = {
+        'db': db_manager,
+        'qr': QRGenerator(),
+        'attendance': attendance_manager,
+        'reports': ReportGenerator(db_manager),
+        'notifications': notification_system,
+        'auth': auth_manager,
+        'rooms': room_manager,
+        'students': student_manager,
+        'redis': redis_client
+    }
+    return app.extensions['scanme']
+
+_managers_lock = threading.Lock()
+
+def get_manager(name):
+    """Return a system component, constructing all of them on first use"""
+    managers = app.extensions.get('scanme')
+    if managers is None:
+        with _managers_lock:
+            managers = app.extensions.get('scanme') or init_managers(app)
+    return managers[name]
+
+def create_app():
+    """Return the application with its system components initialized"""
+    get_manager('db')
+    return app
+
+@app.cli.command('warmup')
+def warmup_command():
+    """Initialize the database and system components ahead of serving traffic"""
+    create_app()
+    logger.info("System components initialized")
+
+# Components are built on first use rather than at import time
+db_manager = LocalProxy(partial(get_manager, 'db'))
+qr_generator = LocalProxy(partial(get_manager, 'qr'))
+attendance_manager = LocalProxy(partial(get_manager, 'attendance'))
+report_generator = LocalProxy(partial(get_manager, 'reports'))
+notification_system = LocalProxy(partial(get_manager, 'notifications'))
+auth_manager = LocalProxy(partial(get_manager, 'auth'))
+room_manager = LocalProxy(partial(get_manager, 'rooms'))
+student_manager = LocalProxy(partial(get_manager, 'students'))
+
+@app.before_request
+def acquire_db_connection():
+    """Check a pooled database connection out for the current request"""
+    g.db = db_manager.acquire_connection()
+
+@app.teardown_request
+def release_db_connection(exception=None):
+    """Return the request's database connection to the pool"""
+    db = g.pop('db', None)
+    if db is not None:
+        db_manager.release_connection(db)
 
 def login_required(f):
     """Decorator to require login for protected routes"""
@@ -83,6 +260,66 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+@cache.cached(timeout=30, key_prefix='index_stats')
+def get_index_stats():
+    """Landing page aggregates, cached briefly and invalidated on new scans"""
+    # Get recent activity for display (limited to last 10 entries)
+    recent_scans = attendance_manager.get_recent_attendance(limit=10)
+    total_students = student_manager.get_student_count()
+    total_rooms = room_manager.get_room_count()
+    today_scans = attendance_manager.get_today_scan_count()
+    
+    return recent_scans, total_students, total_rooms, today_scans
+
+@cache.cached(timeout=15, key_prefix='admin_stats')
+def get_admin_stats_payload():
+    """Serialized admin headline counts and their ETag, cached briefly and invalidated on new scans"""
+    payload = app.json.dumps(db_manager.get_admin_overview()).encode()
+    etag = hashlib.blake2b(payload, digest_size=8).hexdigest()
+    return payload, etag
+
+def get_rooms_payload():
+    """Serialized active room list, cached until the rooms table changes"""
+    key = f"rooms_payload_{room_manager.rooms_version}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = app.json.dumps(room_manager.get_all_rooms())
+        # Bounded so workers that missed another worker's change catch up
+        cache.set(key, payload, timeout=300)
+    return payload
+
+def render_static_page(template_name):
+    """
+    Render a request-independent template once and store it under static/_gen.
+    
+    Args:
+        template_name (str): Template to pre-render
+    
+    Returns:
+        str: Generated file name, versioned by the template's modification time
+    """
+    template = app.jinja_env.get_template(template_name)
+    version = int(os.path.getmtime(template.filename))
+    base, ext = os.path.splitext(template_name)
+    filename = f"{base}.{version}{ext}"
+    
+    output_dir = app.config['GENERATED_PAGES_DIR']
+    path = os.path.join(output_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(output_dir, exist_ok=True)
+        # Write then rename so concurrent workers never serve a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(render_template(template_name))
+        os.replace(tmp_path, path)
+    
+    return filename
+
+def etag_matches(etag):
+    """Check If-None-Match, ignoring the ':gzip'-style suffix Flask-Compress appends"""
+    return any(tag.split(':')[0] == etag
+               for tag in request.if_none_match.as_set(include_weak=True))
+
 @app.route('/')
 def index():
     """Main landing page"""
@@ -90,21 +327,28 @@ def index():
         if 'user_id' in session:
             return redirect(url_for('dashboard'))
         
-        # Get recent activity for display (limited to last 10 entries)
-        recent_scans = attendance_manager.get_recent_attendance(limit=10)
-        total_students = student_manager.get_student_count()
-        total_rooms = room_manager.get_room_count()
+        recent_scans, total_students, total_rooms, today_scans = get_index_stats()
         
         stats = {
             'total_students': total_students,
             'total_rooms': total_rooms,
-            'today_scans': len([scan for scan in recent_scans 
-                              if scan['date'] == datetime.now().strftime('%Y-%m-%d')])
+            'today_scans': today_scans
         }
         
-        return render_template('index.html', 
-                             recent_scans=recent_scans, 
-                             stats=stats)
+        # Checked before rendering, which consumes the flashed messages
+        has_flashes = '_flashes' in session
+        
+        response = make_response(render_template('index.html', 
+                                                 recent_scans=recent_scans, 
+                                                 stats=stats))
+        
+        # Anonymous landing page is the same for every visitor; let browsers
+        # and proxies absorb repeat hits unless it carries a one-off message
+        if not has_flashes:
+            response.cache_control.public = True
+            response.cache_control.max_age = 30
+        
+        return response
     
     except Exception as e:
         logger.error(f"Error in index route: {str(e)}")
@@ -143,6 +387,9 @@ def login():
                 flash('Invalid username or password.', 'error')
                 logger.warning(f"Failed login attempt for username: {username}")
         
+        except PasswordCheckUnavailable:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+        
         except Exception as e:
             logger.error(f"Login error: {str(e)}")
             flash('An error occurred during login. Please try again.', 'error')
@@ -237,16 +484,9 @@ def dashboard():
 def admin_dashboard():
     """Admin dashboard with system overview"""
     try:
-        # Get comprehensive admin statistics
-        today_summary = attendance_manager.get_today_attendance_summary()
-        stats = {
-            'total_students': student_manager.get_student_count(),
-            'total_professors': auth_manager.get_professor_count(),
-            'total_rooms': room_manager.get_room_count(),
-            'today_scans': today_summary.get('total_scans', 0),
-            'active_sessions': today_summary.get('unique_students', 0),
-            'recent_activity': attendance_manager.get_recent_attendance(limit=20)
-        }
+        # Get comprehensive admin statistics (all headline counts in one query)
+        stats = db_manager.get_admin_overview()
+        stats['recent_activity'] = attendance_manager.get_recent_attendance(limit=20)
         
         # Get room occupancy data
         room_occupancy = room_manager.get_room_occupancy_stats()
@@ -293,13 +533,37 @@ def admin_dashboard():
                              attendance_trends={},
                              data=fallback_data)
 
+@app.route('/api/admin/stats')
+@admin_required
+def admin_stats_api():
+    """Admin headline counts as JSON, revalidated by ETag"""
+    try:
+        payload, etag = get_admin_stats_payload()
+        
+        if etag_matches(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(payload, mimetype='application/json')
+        
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    except Exception as e:
+        logger.error(f"Admin stats error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Unable to load statistics'
+        }), 500
+
 @app.route('/scan')
 @login_required
 def scan_page():
-    """QR code scanning interface"""
+    """QR code scanning interface, served pre-rendered; rooms come from /api/rooms"""
     try:
-        rooms = room_manager.get_all_rooms()
-        return render_template('scan.html', rooms=rooms)
+        filename = render_static_page('scan.html')
+        return send_from_directory(app.config['GENERATED_PAGES_DIR'], filename,
+                                   mimetype='text/html')
     
     except Exception as e:
         logger.error(f"Scan page error: {str(e)}")
@@ -331,6 +595,10 @@ def process_scan():
         result = attendance_manager.process_attendance_scan(qr_code, room_id)
         
         if result['success']:
+            # Landing page stats are stale once a new scan lands
+            cache.delete('index_stats')
+            cache.delete('admin_stats')
+            
             # Send real-time notification
             notification_data = {
                 'student_name': result['student']['name'],
@@ -339,10 +607,23 @@ def process_scan():
                 'year_section': f"{result['student']['year']}{result['student']['section']}",
                 'room_name': result['room']['name'],
                 'timestamp': result['timestamp'],
-                'status': result['status']
+                'status': result['attendance']['status']
             }
             
-            notification_system.send_attendance_notification(notification_data)
+            # The scan is already recorded, so a Redis failure must not fail
+            # the request; fall back to broadcasting from this worker only
+            published = False
+            redis_client = get_manager('redis')
+            if redis_client is not None:
+                try:
+                    redis_client.publish('attendance', json.dumps(notification_data))
+                    published = True
+                except Exception as e:
+                    logger.error(f"Failed to publish scan notification: {str(e)}")
+            
+            # Stored and processed once here; when published, every worker's
+            # listener (this one included) does the WebSocket broadcast
+            notification_system.send_attendance_notification(notification_data, broadcast=not published)
             
             return jsonify({
                 'success': True,
@@ -363,6 +644,68 @@ def process_scan():
             'message': 'An error occurred while processing the scan'
         }), 500
 
+@app.route('/api/scan/bulk', methods=['POST'])
+@login_required
+def process_scan_bulk():
+    """Record a batch of buffered scans (e.g. from an offline kiosk)"""
+    try:
+        data = request.get_json() or {}
+        scans = data.get('scans')
+
+        if not isinstance(scans, list) or not scans:
+            return jsonify({
+                'success': False,
+                'message': 'No scans provided'
+            }), 400
+
+        result = attendance_manager.process_attendance_scans_bulk(scans, session.get('user_id'))
+
+        if result.get('recorded'):
+            cache.delete('index_stats')
+            cache.delete('admin_stats')
+
+        # Rejected items are reported per item; only a failure to process the
+        # batch as a whole is a server error
+        return jsonify(result), 200 if result['success'] else 500
+
+    except Exception as e:
+        logger.error(f"Bulk scan processing error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'An error occurred while processing the scans'
+        }), 500
+
+@app.route('/api/rooms')
+@login_required
+def rooms_api():
+    """Active rooms for the scanner's room picker"""
+    try:
+        return app.response_class(get_rooms_payload(), mimetype='application/json')
+    
+    except Exception as e:
+        logger.error(f"Rooms API error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Unable to load rooms'
+        }), 500
+
+@app.route('/api/recent-scans')
+@login_required
+def recent_scans_api():
+    """Today's scans for the live feed, serialized column-wise"""
+    try:
+        return jsonify({
+            'success': True,
+            'columns': attendance_manager.get_today_scans_columnar()
+        })
+
+    except Exception as e:
+        logger.error(f"Recent scans error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Unable to load recent scans'
+        }), 500
+
 @app.route('/reports')
 @login_required
 def reports():
@@ -376,12 +719,13 @@ def reports():
         return redirect(url_for('dashboard'))
 
 if __name__ == '__main__':
-    # Initialize database on startup
+    # Initialize database and system components on startup
     try:
-        db_manager.initialize_database()
+        create_app()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {str(e)}")
     
     # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=os.environ.get('DEBUG', 'True').lower() in ['true', 'on', '1'],
+            host='0.0.0.0', port=5000)
\ No newline at end of file
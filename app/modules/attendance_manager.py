@@ -20,10 +20,78 @@ Features:
 
 from datetime import datetime, timedelta, time
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import atexit
+import queue
+import threading
+from time import monotonic
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 import json
+from collections import Counter, defaultdict
 from dataclasses import dataclass
+from functools import cached_property
 from app.modules.qr_generator import QRGenerator
+from app.modules.date_utils import today_str
+
+# Scan hot-path statements. Keeping each as a single module-level string means
+# every call hands sqlite3 the identical SQL text, so the connection's
+# statement cache (cached_statements) reuses the compiled statement.
+_SQL_GET_STUDENT = """SELECT * FROM students WHERE student_id = ? AND is_active = 1"""
+
+_SQL_GET_ROOM = """SELECT * FROM rooms WHERE id = ? AND is_active = 1"""
+
+_SQL_EXISTING_ATTENDANCE = """SELECT a.*, s.student_id, s.first_name, s.last_name, r.room_name, r.room_code
+                   FROM attendance a
+                   JOIN students s ON a.student_id = s.id
+                   JOIN rooms r ON a.room_id = r.id
+                   WHERE a.student_id = ? AND a.room_id = ? AND a.scan_date = ?"""
+
+# Everything a scan needs to know before inserting, in one statement: an
+# existing record for the room today, the student's scans today, and the
+# class scheduled in the room right now
+_SQL_SCAN_CONTEXT = """SELECT (SELECT id FROM attendance 
+                           WHERE student_id = ? AND room_id = ? AND scan_date = ?) as duplicate_id,
+                          (SELECT COUNT(*) FROM attendance 
+                           WHERE student_id = ? AND scan_date = ?) as daily_scans,
+                          ra.subject_id, ra.start_time, ra.end_time
+                   FROM (SELECT 1)
+                   LEFT JOIN room_assignments ra 
+                     ON ra.room_id = ? AND ra.day_of_week = ? 
+                     AND ra.start_time <= ? AND ra.end_time >= ?
+                     AND ra.is_active = 1
+                   LIMIT 1"""
+
+# Recent scans feed; {limit} is filled with a literal for the common page
+# sizes so SQLite plans against the actual row count, or with ? otherwise
+_SQL_RECENT_ATTENDANCE = """SELECT a.*, 
+                          s.student_id, s.first_name, s.last_name, s.department, 
+                          s.year_level, s.section,
+                          r.room_name, r.room_code, r.building,
+                          sub.subject_name, sub.subject_code,
+                          u.full_name as scanned_by_name
+                   FROM attendance a
+                   JOIN students s ON a.student_id = s.id
+                   JOIN rooms r ON a.room_id = r.id
+                   LEFT JOIN subjects sub ON a.subject_id = sub.id
+                   LEFT JOIN users u ON a.scanned_by = u.id
+                   ORDER BY a.created_at DESC
+                   LIMIT {limit}"""
+
+_SQL_INSERT_ATTENDANCE = """INSERT OR IGNORE INTO attendance 
+                       (student_id, room_id, subject_id, scan_date, scan_time, status, scanned_by)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+def _hms_to_seconds(value: str) -> int:
+    """
+    Convert an HH:MM[:SS] time string to seconds since midnight.
+    
+    Args:
+        value (str): Time string
+    
+    Returns:
+        int: Seconds since midnight
+    """
+    parts = value.split(':')
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + (int(parts[2]) if len(parts) > 2 else 0)
 
 @dataclass
 class AttendanceRecord:
@@ -53,7 +121,6 @@ class AttendanceManager:
             database_manager: Database manager instance
         """
         self.db = database_manager
-        self.qr_generator = QRGenerator()
         self.logger = logging.getLogger(__name__)
         
         # Attendance status constants
@@ -61,27 +128,133 @@ class AttendanceManager:
         self.STATUS_LATE = 'late'
         self.STATUS_ABSENT = 'absent'
         self.STATUS_EXCUSED = 'excused'
+        self.VALID_STATUSES = frozenset((self.STATUS_PRESENT, self.STATUS_LATE,
+                                         self.STATUS_ABSENT, self.STATUS_EXCUSED))
+        
+        # Time thresholds, overridden by system settings on first use
+        self.DEFAULT_LATE_THRESHOLD_MINUTES = 15  # Minutes after class start to mark as late
+        self.DEFAULT_MAX_DAILY_SCANS = 5  # Maximum scans per student per day
+        
+        # SQLite builds before 3.32 reject statements with more than 999 parameters
+        self.MAX_BOUND_PARAMETERS = 999
+        
+        # Recent-scan queries with the LIMIT inlined for the page sizes in use
+        self._recent_sql_by_limit = {
+            limit: _SQL_RECENT_ATTENDANCE.format(limit=limit) for limit in (10, 20, 50)
+        }
         
-        # Time thresholds
-        self.late_threshold_minutes = 15  # Minutes after class start to mark as late
-        self.max_daily_scans = 5  # Maximum scans per student per day
+        # Pending inserts when write-behind is enabled
+        self._scan_queue = None
         
-        # Load system settings
-        self._load_system_settings()
+        # Short-lived caches for the per-scan student and room lookups. The
+        # Student/RoomManager in this process invalidate them on edits; the
+        # TTL bounds how long other worker processes can see a stale row
+        self.lookup_cache_ttl = 60  # Seconds
+        self._student_cache = {}  # student_id -> (cached_at, row)
+        self._room_cache = {}  # room_id -> (cached_at, row)
+        
+        # Dashboard trend analytics, keyed by number of days
+        self.trends_cache_ttl = 60  # Seconds
+        self._trends_cache = {}  # days -> (cached_at, trends)
     
-    def _load_system_settings(self):
-        """Load attendance-related system settings from database."""
+    def enable_write_behind(self, batch_size: int = 100, flush_interval: float = 0.05) -> None:
+        """
+        Record scans through a background writer that batches inserts.
+        
+        Validation still runs synchronously, but the INSERT is queued and written
+        together with other scans arriving within the flush interval, so one
+        commit covers the whole burst. Scans are acknowledged before the row
+        exists, hence the response carries no attendance ID.
+        
+        Args:
+            batch_size (int): Maximum rows written per commit
+            flush_interval (float): Seconds to wait for more scans before writing
+        """
+        if self._scan_queue is not None:
+            return
+        
+        self._scan_queue = queue.Queue()
+        self._scan_writer = threading.Thread(
+            target=self._write_queued_scans,
+            args=(batch_size, flush_interval),
+            daemon=True
+        )
+        self._scan_writer.start()
+        
+        # Let queued scans reach the database before the interpreter exits
+        atexit.register(self._scan_queue.join)
+        
+        self.logger.info("Attendance write-behind enabled")
+    
+    def _write_queued_scans(self, batch_size: int, flush_interval: float) -> None:
+        """Background thread that drains the scan queue in batches."""
+        while True:
+            batch = [self._scan_queue.get()]
+            deadline = monotonic() + flush_interval
+            
+            while len(batch) < batch_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._scan_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                # Duplicates racing inside one flush window are dropped by the
+                # UNIQUE(student_id, room_id, scan_date) constraint
+                self.db.execute_many(
+                    _SQL_INSERT_ATTENDANCE,
+                    batch
+                )
+            except Exception as e:
+                self.logger.error("Failed to write %s queued attendance records: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._scan_queue.task_done()
+    
+    @cached_property
+    def qr_generator(self) -> QRGenerator:
+        """QR code validator, created on first scan rather than at construction."""
+        return QRGenerator()
+    
+    @cached_property
+    def _settings(self) -> Dict[str, int]:
+        """Load attendance-related system settings from database on first use."""
+        settings = {
+            'late_threshold_minutes': self.DEFAULT_LATE_THRESHOLD_MINUTES,
+            'max_daily_scans': self.DEFAULT_MAX_DAILY_SCANS
+        }
         try:
-            late_threshold = self.db.get_system_setting('late_threshold_minutes', '15')
-            self.late_threshold_minutes = int(late_threshold)
+            late_threshold = self.db.get_system_setting('late_threshold_minutes', str(settings['late_threshold_minutes']))
+            settings['late_threshold_minutes'] = int(late_threshold)
             
-            max_scans = self.db.get_system_setting('max_daily_scans', '5')
-            self.max_daily_scans = int(max_scans)
+            max_scans = self.db.get_system_setting('max_daily_scans', str(settings['max_daily_scans']))
+            settings['max_daily_scans'] = int(max_scans)
             
             self.logger.info("Attendance system settings loaded successfully")
         
         except Exception as e:
-            self.logger.error(f"Failed to load system settings: {str(e)}")
+            self.logger.error("Failed to load system settings: %s", e)
+        
+        settings['late_threshold_seconds'] = settings['late_threshold_minutes'] * 60
+        return settings
+    
+    @property
+    def late_threshold_minutes(self) -> int:
+        """Minutes after class start after which a scan counts as late."""
+        return self._settings['late_threshold_minutes']
+    
+    @property
+    def late_threshold_seconds(self) -> int:
+        """Late threshold in seconds, for comparing against seconds since midnight."""
+        return self._settings['late_threshold_seconds']
+    
+    @property
+    def max_daily_scans(self) -> int:
+        """Maximum scans recorded per student per day."""
+        return self._settings['max_daily_scans']
     
     def process_attendance_scan(self, qr_data: str, room_id: int, 
                                scanned_by: Optional[int] = None) -> Dict[str, Any]:
@@ -140,44 +313,73 @@ class AttendanceManager:
                     'error_type': 'inactive_room'
                 }
             
-            # Check for duplicate scans
-            current_date = datetime.now().strftime('%Y-%m-%d')
-            existing_attendance = self._check_existing_attendance(
-                student['id'], room_id, current_date
+            # Read the clock once so date, time and timestamp agree
+            now = datetime.now()
+            current_date = now.date().isoformat()
+            scan_time_str = now.time().isoformat(timespec='seconds')
+            
+            context = self._get_scan_context(
+                student['id'], room_id, current_date, now.weekday(), scan_time_str
             )
             
-            if existing_attendance:
-                return {
-                    'success': False,
-                    'message': f"Attendance already recorded for {student['first_name']} {student['last_name']} in this room today",
-                    'error_type': 'duplicate_scan',
-                    'existing_record': existing_attendance
-                }
+            # A re-scan of the same room is reported as a duplicate even when
+            # the student is also at the daily limit. Only a duplicate needs
+            # the joined record, to describe it
+            if context['duplicate_id'] is not None:
+                existing_attendance = self._check_existing_attendance(
+                    student['id'], room_id, current_date
+                )
+                return self._duplicate_scan_result(student, existing_attendance)
             
             # Check daily scan limit
-            daily_scans = self._get_daily_scan_count(student['id'], current_date)
-            if daily_scans >= self.max_daily_scans:
+            if context['daily_scans'] >= self.max_daily_scans:
                 return {
                     'success': False,
                     'message': f"Maximum daily scans ({self.max_daily_scans}) exceeded for this student",
                     'error_type': 'scan_limit_exceeded'
                 }
             
+            assignment = context['assignment']
+            subject_id = assignment['subject_id'] if assignment else None
+            
             # Determine attendance status based on time
-            current_time = datetime.now().time()
-            attendance_status = self._determine_attendance_status(room_id, current_time)
+            attendance_status = self._determine_attendance_status(assignment, scan_time_str)
             
             # Record attendance
-            attendance_record = self._record_attendance(
-                student['id'],
-                room_id,
-                current_date,
-                current_time.strftime('%H:%M:%S'),
-                attendance_status,
-                scanned_by
-            )
+            if self._scan_queue is not None:
+                # Written by the background writer; the row ID is not known yet
+                attendance_record = None
+                recorded = self._queue_attendance(
+                    student['id'],
+                    room_id,
+                    subject_id,
+                    current_date,
+                    scan_time_str,
+                    attendance_status,
+                    scanned_by
+                )
+            else:
+                attendance_record = self._record_attendance(
+                    student['id'],
+                    room_id,
+                    subject_id,
+                    current_date,
+                    scan_time_str,
+                    attendance_status,
+                    scanned_by
+                )
+                
+                # A concurrent scan that got in first is rejected by the
+                # UNIQUE(student_id, room_id, scan_date) constraint
+                if attendance_record == 0:
+                    existing_attendance = self._check_existing_attendance(
+                        student['id'], room_id, current_date
+                    )
+                    return self._duplicate_scan_result(student, existing_attendance)
+                
+                recorded = attendance_record is not None
             
-            if attendance_record:
+            if recorded:
                 # Prepare success response
                 result = {
                     'success': True,
@@ -198,13 +400,13 @@ class AttendanceManager:
                     'attendance': {
                         'id': attendance_record,
                         'date': current_date,
-                        'time': current_time.strftime('%H:%M:%S'),
+                        'time': scan_time_str,
                         'status': attendance_status
                     },
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    'timestamp': now.isoformat(sep=' ', timespec='seconds')
                 }
                 
-                self.logger.info(f"Attendance recorded: Student {student['student_id']}, Room {room['room_code']}, Status: {attendance_status}")
+                self.logger.info("Attendance recorded: Student %s, Room %s, Status: %s", student['student_id'], room['room_code'], attendance_status)
                 return result
             
             else:
@@ -215,12 +417,209 @@ class AttendanceManager:
                 }
         
         except Exception as e:
-            self.logger.error(f"Attendance scan processing failed: {str(e)}")
+            self.logger.error("Attendance scan processing failed: %s", e)
             return {
                 'success': False,
                 'message': 'An error occurred while processing the scan',
                 'error_type': 'system_error'
             }
+
+    def process_attendance_scans_bulk(self, scans: List[Dict[str, Any]],
+                                      scanned_by: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Record a batch of QR code scans, e.g. scans buffered by an offline kiosk.
+
+        Students, rooms, schedules and existing attendance are prefetched with
+        one IN-list query each (split only for very large batches) and all
+        accepted rows are written with a single executemany, instead of
+        running the full single-scan path once per scan.
+
+        Args:
+            scans (List[Dict[str, Any]]): Scans with 'qr_code', 'room_id' and an
+                optional 'scanned_at' timestamp (YYYY-MM-DD HH:MM:SS)
+            scanned_by (int): ID of user who submitted the batch
+
+        Returns:
+            Dict[str, Any]: Number of recorded scans and per-scan failures;
+                success is False only if the batch itself could not be processed
+        """
+        failed = []
+        try:
+            now = datetime.now()
+            parsed = []
+
+            # Validate QR codes and timestamps before touching the database
+            for index, scan in enumerate(scans):
+                qr_code = scan.get('qr_code') if isinstance(scan, dict) else None
+                if not isinstance(qr_code, str) or not qr_code.strip():
+                    failed.append({'index': index, 'error_type': 'validation_error',
+                                   'message': 'No QR code data provided'})
+                    continue
+
+                qr_validation = self.qr_generator.validate_qr_code(qr_code.strip())
+                if not qr_validation['valid']:
+                    failed.append({'index': index, 'error_type': qr_validation.get('error_type', 'validation_error'),
+                                   'message': f"Invalid QR code: {qr_validation['error']}"})
+                    continue
+
+                try:
+                    scanned_at = (datetime.strptime(scan['scanned_at'], '%Y-%m-%d %H:%M:%S')
+                                  if scan.get('scanned_at') else now)
+                    room_id = int(scan['room_id'])
+                except (KeyError, TypeError, ValueError):
+                    failed.append({'index': index, 'error_type': 'validation_error',
+                                   'message': 'Missing or invalid room_id/scanned_at'})
+                    continue
+
+                parsed.append((index, qr_validation['data']['student_id'], room_id, scanned_at))
+
+            if not parsed:
+                return {'success': True, 'recorded': 0, 'duplicates': 0, 'failed': failed}
+
+            # Prefetch everything the batch refers to
+            student_codes = list({p[1] for p in parsed})
+            room_ids = list({p[2] for p in parsed})
+            dates = tuple({p[3].date().isoformat() for p in parsed})
+
+            students = {row['student_id']: row for row in self._select_in(
+                """SELECT id, student_id FROM students
+                   WHERE is_active = 1 AND student_id IN ({})""",
+                student_codes
+            )}
+            rooms = {row['id'] for row in self._select_in(
+                """SELECT id FROM rooms
+                   WHERE is_active = 1 AND id IN ({})""",
+                room_ids
+            )}
+            assignments = {}
+            for row in self._select_in(
+                """SELECT room_id, day_of_week, subject_id, start_time, end_time FROM room_assignments
+                   WHERE is_active = 1 AND room_id IN ({})""",
+                room_ids
+            ):
+                assignments.setdefault((row['room_id'], row['day_of_week']), []).append(row)
+
+            # Existing (student, room, date) rows; attendance is UNIQUE on them,
+            # so the daily count per student is the number of their rooms
+            seen = set()
+            scan_counts = {}
+            for row in self._select_in(
+                f"""SELECT student_id, room_id, scan_date FROM attendance
+                    WHERE student_id IN ({{}})
+                    AND scan_date IN ({','.join('?' * len(dates))})""",
+                [s['id'] for s in students.values()],
+                dates
+            ):
+                seen.add((row['student_id'], row['room_id'], row['scan_date']))
+                count_key = (row['student_id'], row['scan_date'])
+                scan_counts[count_key] = scan_counts.get(count_key, 0) + 1
+
+            rows = []
+            duplicates = 0
+            for index, student_code, room_id, scanned_at in parsed:
+                student = students.get(student_code)
+                if not student:
+                    failed.append({'index': index, 'error_type': 'student_not_found',
+                                   'message': 'Student not found in database'})
+                    continue
+                if room_id not in rooms:
+                    failed.append({'index': index, 'error_type': 'room_not_found',
+                                   'message': 'Room not found'})
+                    continue
+
+                scan_date = scanned_at.date().isoformat()
+                scan_time = scanned_at.time().isoformat(timespec='seconds')
+
+                # Duplicates are reported before the daily limit, as for single
+                # scans, and only rows that will insert count towards the limit
+                attendance_key = (student['id'], room_id, scan_date)
+                if attendance_key in seen:
+                    duplicates += 1
+                    continue
+
+                count_key = (student['id'], scan_date)
+                if scan_counts.get(count_key, 0) >= self.max_daily_scans:
+                    failed.append({'index': index, 'error_type': 'scan_limit_exceeded',
+                                   'message': f"Maximum daily scans ({self.max_daily_scans}) exceeded for this student"})
+                    continue
+
+                seen.add(attendance_key)
+                scan_counts[count_key] = scan_counts.get(count_key, 0) + 1
+
+                assignment = next((a for a in assignments.get((room_id, scanned_at.weekday()), [])
+                                   if a['start_time'] <= scan_time <= a['end_time']), None)
+                status = self._determine_attendance_status(assignment, scan_time)
+
+                rows.append((student['id'], room_id, assignment['subject_id'] if assignment else None,
+                             scan_date, scan_time, status, scanned_by))
+
+            # Rows recorded concurrently since the prefetch are skipped by the
+            # UNIQUE constraint and also count as duplicates
+            recorded = self.db.execute_many(
+                _SQL_INSERT_ATTENDANCE,
+                rows
+            ) if rows else 0
+            duplicates += len(rows) - recorded
+
+            failed.sort(key=lambda failure: failure['index'])
+            self.logger.info("Bulk attendance: %s recorded, %s duplicates, %s rejected", recorded, duplicates, len(failed))
+            return {
+                'success': True,
+                'recorded': recorded,
+                'duplicates': duplicates,
+                'failed': failed
+            }
+
+        except Exception as e:
+            self.logger.error("Bulk attendance processing failed: %s", e)
+            return {
+                'success': False,
+                'recorded': 0,
+                'failed': failed,
+                'error': 'An error occurred while processing the scans'
+            }
+
+    def _select_in(self, query: str, values: List[Any], extra_params: Tuple = ()) -> List[Any]:
+        """
+        Run a SELECT with an IN list, split so no statement exceeds SQLite's bound parameter limit.
+        
+        Args:
+            query (str): SQL with a single {} placeholder for the IN list
+            values (List[Any]): Values for the IN list
+            extra_params (Tuple): Parameters bound after the IN list
+        
+        Returns:
+            List[sqlite3.Row]: Rows from all chunks, read by column name
+        """
+        rows = []
+        chunk_size = max(1, self.MAX_BOUND_PARAMETERS - len(extra_params))
+        for start in range(0, len(values), chunk_size):
+            chunk = tuple(values[start:start + chunk_size])
+            rows.extend(self.db.execute_query(
+                query.format(','.join('?' * len(chunk))),
+                chunk + tuple(extra_params),
+                as_dict=False
+            ))
+        return rows
+    
+    def _duplicate_scan_result(self, student: Dict[str, Any],
+                               existing_attendance: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the scan response for a student already recorded in the room today.
+        
+        Args:
+            student (Dict[str, Any]): Student information
+            existing_attendance (Dict[str, Any]): Existing attendance record
+        
+        Returns:
+            Dict[str, Any]: Duplicate scan result
+        """
+        return {
+            'success': False,
+            'message': f"Attendance already recorded for {student['first_name']} {student['last_name']} in this room today",
+            'error_type': 'duplicate_scan',
+            'existing_record': existing_attendance
+        }
     
     def _get_student_by_id(self, student_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -232,14 +631,20 @@ class AttendanceManager:
         Returns:
             Dict[str, Any]: Student information or None
         """
+        cached = self._student_cache.get(student_id)
+        if cached and monotonic() - cached[0] < self.lookup_cache_ttl:
+            return cached[1]
+        
         try:
-            return self.db.execute_query(
-                """SELECT * FROM students WHERE student_id = ? AND is_active = 1""",
-                (student_id,),
-                fetch_all=False
-            )
+            # Runs on every uncached scan, so skip the execute_query wrapper
+            with self.db.get_connection(readonly=True) as conn:
+                row = conn.execute(_SQL_GET_STUDENT, (student_id,)).fetchone()
+            student = dict(row) if row else None
+            if student:
+                self._student_cache[student_id] = (monotonic(), student)
+            return student
         except Exception as e:
-            self.logger.error(f"Failed to get student {student_id}: {str(e)}")
+            self.logger.error("Failed to get student %s: %s", student_id, e)
             return None
     
     def _get_room_by_id(self, room_id: int) -> Optional[Dict[str, Any]]:
@@ -252,102 +657,122 @@ class AttendanceManager:
         Returns:
             Dict[str, Any]: Room information or None
         """
+        cached = self._room_cache.get(room_id)
+        if cached and monotonic() - cached[0] < self.lookup_cache_ttl:
+            return cached[1]
+        
         try:
-            return self.db.execute_query(
-                """SELECT * FROM rooms WHERE id = ? AND is_active = 1""",
-                (room_id,),
-                fetch_all=False
-            )
+            with self.db.get_connection(readonly=True) as conn:
+                row = conn.execute(_SQL_GET_ROOM, (room_id,)).fetchone()
+            room = dict(row) if row else None
+            if room:
+                self._room_cache[room_id] = (monotonic(), room)
+            return room
         except Exception as e:
-            self.logger.error(f"Failed to get room {room_id}: {str(e)}")
+            self.logger.error("Failed to get room %s: %s", room_id, e)
             return None
     
-    def _check_existing_attendance(self, student_id: int, room_id: int, date: str) -> Optional[Dict[str, Any]]:
+    def invalidate_student(self, student_id: Optional[str] = None) -> None:
         """
-        Check if attendance already exists for student in room on specific date.
+        Drop cached student lookups after a student is edited or deactivated.
+        
+        Args:
+            student_id (str): Student ID to drop, or None to clear all
+        """
+        if student_id is None:
+            self._student_cache.clear()
+        else:
+            self._student_cache.pop(student_id, None)
+    
+    def invalidate_room(self, room_id: Optional[int] = None) -> None:
+        """
+        Drop cached room lookups after a room is edited or deactivated.
+        
+        Args:
+            room_id (int): Room ID to drop, or None to clear all
+        """
+        if room_id is None:
+            self._room_cache.clear()
+        else:
+            self._room_cache.pop(room_id, None)
+    
+    def _get_scan_context(self, student_id: int, room_id: int, date: str,
+                          weekday: int, time_str: str) -> Dict[str, Any]:
+        """
+        Get the duplicate, daily-limit and schedule facts for a scan in one query.
         
         Args:
             student_id (int): Student database ID
             room_id (int): Room ID
             date (str): Date string (YYYY-MM-DD)
+            weekday (int): Day of week (0 = Monday, 6 = Sunday)
+            time_str (str): Time string (HH:MM:SS)
         
         Returns:
-            Dict[str, Any]: Existing attendance record or None
+            Dict[str, Any]: duplicate_id (existing record ID or None), daily_scans,
+                            and assignment (subject_id, start_time and end_time
+                            of the scheduled class, or None)
         """
         try:
-            return self.db.execute_query(
-                """SELECT a.*, s.student_id, s.first_name, s.last_name, r.room_name, r.room_code
-                   FROM attendance a
-                   JOIN students s ON a.student_id = s.id
-                   JOIN rooms r ON a.room_id = r.id
-                   WHERE a.student_id = ? AND a.room_id = ? AND a.scan_date = ?""",
-                (student_id, room_id, date),
+            row = self.db.execute_query(
+                _SQL_SCAN_CONTEXT,
+                (student_id, room_id, date,
+                 student_id, date,
+                 room_id, weekday, time_str, time_str),
                 fetch_all=False
             )
+            return {
+                'duplicate_id': row['duplicate_id'],
+                'daily_scans': row['daily_scans'],
+                'assignment': {
+                    'subject_id': row['subject_id'],
+                    'start_time': row['start_time'],
+                    'end_time': row['end_time']
+                } if row['start_time'] is not None else None
+            }
         except Exception as e:
-            self.logger.error(f"Failed to check existing attendance: {str(e)}")
-            return None
+            self.logger.error("Failed to get scan context: %s", e)
+            return {'duplicate_id': None, 'daily_scans': 0, 'assignment': None}
     
-    def _get_daily_scan_count(self, student_id: int, date: str) -> int:
+    def _check_existing_attendance(self, student_id: int, room_id: int, date: str) -> Optional[Dict[str, Any]]:
         """
-        Get the number of scans for a student on a specific date.
+        Check if attendance already exists for student in room on specific date.
         
         Args:
             student_id (int): Student database ID
+            room_id (int): Room ID
             date (str): Date string (YYYY-MM-DD)
         
         Returns:
-            int: Number of scans
+            Dict[str, Any]: Existing attendance record or None
         """
         try:
-            result = self.db.execute_query(
-                """SELECT COUNT(*) as scan_count FROM attendance 
-                   WHERE student_id = ? AND scan_date = ?""",
-                (student_id, date),
+            return self.db.execute_query(
+                _SQL_EXISTING_ATTENDANCE,
+                (student_id, room_id, date),
                 fetch_all=False
             )
-            return result['scan_count'] if result else 0
         except Exception as e:
-            self.logger.error(f"Failed to get daily scan count: {str(e)}")
-            return 0
+            self.logger.error("Failed to check existing attendance: %s", e)
+            return None
     
-    def _determine_attendance_status(self, room_id: int, scan_time: time) -> str:
+    def _determine_attendance_status(self, assignment: Optional[Dict[str, Any]], scan_time_str: str) -> str:
         """
         Determine attendance status based on scan time and room schedule.
         
         Args:
-            room_id (int): Room ID
-            scan_time (time): Time of scan
+            assignment (Dict[str, Any]): Active room assignment or None
+            scan_time_str (str): Time of scan (HH:MM:SS)
         
         Returns:
             str: Attendance status
         """
         try:
-            # Get current day of week (0 = Monday, 6 = Sunday)
-            current_weekday = datetime.now().weekday()
-            
-            # Check room assignments for current time and day
-            room_assignment = self.db.execute_query(
-                """SELECT ra.*, s.subject_name 
-                   FROM room_assignments ra
-                   LEFT JOIN subjects s ON ra.subject_id = s.id
-                   WHERE ra.room_id = ? AND ra.day_of_week = ? 
-                   AND ra.start_time <= ? AND ra.end_time >= ?
-                   AND ra.is_active = 1""",
-                (room_id, current_weekday, scan_time.strftime('%H:%M:%S'), scan_time.strftime('%H:%M:%S')),
-                fetch_all=False
-            )
-            
-            if room_assignment:
+            if assignment:
                 # Calculate if student is late
-                start_time = datetime.strptime(room_assignment['start_time'], '%H:%M:%S').time()
-                scan_datetime = datetime.combine(datetime.now().date(), scan_time)
-                start_datetime = datetime.combine(datetime.now().date(), start_time)
+                time_diff = _hms_to_seconds(scan_time_str) - _hms_to_seconds(assignment['start_time'])
                 
-                time_diff = scan_datetime - start_datetime
-                late_threshold = timedelta(minutes=self.late_threshold_minutes)
-                
-                if time_diff > late_threshold:
+                if time_diff > self.late_threshold_seconds:
                     return self.STATUS_LATE
                 else:
                     return self.STATUS_PRESENT
@@ -356,10 +781,10 @@ class AttendanceManager:
                 return self.STATUS_PRESENT
         
         except Exception as e:
-            self.logger.error(f"Failed to determine attendance status: {str(e)}")
+            self.logger.error("Failed to determine attendance status: %s", e)
             return self.STATUS_PRESENT
     
-    def _record_attendance(self, student_id: int, room_id: int, date: str, 
+    def _record_attendance(self, student_id: int, room_id: int, subject_id: Optional[int], date: str, 
                           time_str: str, status: str, scanned_by: Optional[int] = None) -> Optional[int]:
         """
         Record attendance in the database.
@@ -367,42 +792,56 @@ class AttendanceManager:
         Args:
             student_id (int): Student database ID
             room_id (int): Room ID
+            subject_id (int): Scheduled subject ID or None
             date (str): Date string
             time_str (str): Time string
             status (str): Attendance status
             scanned_by (int): ID of user who performed the scan
         
         Returns:
-            int: Attendance record ID or None
+            int: Attendance record ID, 0 if the student is already recorded in
+                 the room on that date, or None on failure
         """
         try:
-            # Get subject ID if there's an active class
-            current_weekday = datetime.now().weekday()
-            subject_assignment = self.db.execute_query(
-                """SELECT subject_id FROM room_assignments 
-                   WHERE room_id = ? AND day_of_week = ? 
-                   AND start_time <= ? AND end_time >= ?
-                   AND is_active = 1""",
-                (room_id, current_weekday, time_str, time_str),
-                fetch_all=False
-            )
-            
-            subject_id = subject_assignment['subject_id'] if subject_assignment else None
-            
             # Insert attendance record
-            attendance_id = self.db.execute_update(
-                """INSERT INTO attendance 
-                   (student_id, room_id, subject_id, scan_date, scan_time, status, scanned_by)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (student_id, room_id, subject_id, date, time_str, status, scanned_by)
-            )
-            
-            return attendance_id
+            with self.db.get_connection() as conn:
+                cursor = conn.execute(
+                    _SQL_INSERT_ATTENDANCE,
+                    (student_id, room_id, subject_id, date, time_str, status, scanned_by)
+                )
+                
+                # lastrowid is stale when the insert was ignored
+                return cursor.lastrowid if cursor.rowcount else 0
         
         except Exception as e:
-            self.logger.error(f"Failed to record attendance: {str(e)}")
+            self.logger.error("Failed to record attendance: %s", e)
             return None
     
+    def _queue_attendance(self, student_id: int, room_id: int, subject_id: Optional[int], date: str, 
+                          time_str: str, status: str, scanned_by: Optional[int] = None) -> bool:
+        """
+        Queue an attendance record for the background writer.
+        
+        Args:
+            student_id (int): Student database ID
+            room_id (int): Room ID
+            subject_id (int): Scheduled subject ID or None
+            date (str): Date string
+            time_str (str): Time string
+            status (str): Attendance status
+            scanned_by (int): ID of user who performed the scan
+        
+        Returns:
+            bool: True if the record was queued
+        """
+        try:
+            self._scan_queue.put((student_id, room_id, subject_id, date, time_str, status, scanned_by))
+            return True
+        
+        except Exception as e:
+            self.logger.error("Failed to queue attendance: %s", e)
+            return False
+    
     def get_recent_attendance(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get recent attendance records across all rooms and students.
@@ -414,26 +853,60 @@ class AttendanceManager:
             List[Dict[str, Any]]: Recent attendance records
         """
         try:
-            return self.db.execute_query(
-                """SELECT a.*, 
-                          s.student_id, s.first_name, s.last_name, s.department, 
-                          s.year_level, s.section,
-                          r.room_name, r.room_code, r.building,
-                          sub.subject_name, sub.subject_code,
-                          u.full_name as scanned_by_name
-                   FROM attendance a
-                   JOIN students s ON a.student_id = s.id
-                   JOIN rooms r ON a.room_id = r.id
-                   LEFT JOIN subjects sub ON a.subject_id = sub.id
-                   LEFT JOIN users u ON a.scanned_by = u.id
-                   ORDER BY a.created_at DESC
-                   LIMIT ?""",
+            query = self._recent_sql_by_limit.get(limit)
+            if query is not None:
+                return self.db.execute_query(query)
+            return self.db.execute_query(_SQL_RECENT_ATTENDANCE.format(limit='?'), (limit,))
+        except Exception as e:
+            self.logger.error("Failed to get recent attendance: %s", e)
+            return []
+
+    def get_today_scans_columnar(self, limit: int = 50) -> Dict[str, List[Any]]:
+        """
+        Get today's scans as column lists for the live scan feed.
+
+        Args:
+            limit (int): Maximum number of scans to retrieve
+
+        Returns:
+            Dict[str, List[Any]]: Column name mapped to values, newest last
+        """
+        try:
+            return self.db.execute_query_columns(
+                """SELECT * FROM (
+                       SELECT a.id, s.first_name || ' ' || s.last_name as student_name,
+                              s.department, r.room_name, a.scan_time, a.status
+                       FROM attendance a
+                       JOIN students s ON a.student_id = s.id
+                       JOIN rooms r ON a.room_id = r.id
+                       WHERE a.scan_date = DATE('now', 'localtime')
+                       ORDER BY a.scan_time DESC
+                       LIMIT ?
+                   ) ORDER BY scan_time""",
                 (limit,)
             )
         except Exception as e:
-            self.logger.error(f"Failed to get recent attendance: {str(e)}")
-            return []
-    
+            self.logger.error("Failed to get today's scans: %s", e)
+            return {}
+
+    def get_today_scan_count(self) -> int:
+        """
+        Get the number of attendance scans recorded today.
+
+        Returns:
+            int: Number of scans today
+        """
+        try:
+            result = self.db.execute_query(
+                "SELECT COUNT(*) as count FROM attendance WHERE scan_date = DATE('now', 'localtime')",
+                fetch_all=False
+            )
+            return result['count'] if result else 0
+
+        except Exception as e:
+            self.logger.error("Failed to get today's scan count: %s", e)
+            return 0
+
     def get_today_attendance_summary(self) -> Dict[str, Any]:
         """
         Get attendance summary for today.
@@ -442,7 +915,7 @@ class AttendanceManager:
             Dict[str, Any]: Today's attendance summary
         """
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = today_str()
             
             # Get total scans today
             total_scans = self.db.execute_query(
@@ -491,9 +964,9 @@ class AttendanceManager:
             }
         
         except Exception as e:
-            self.logger.error(f"Failed to get today's attendance summary: {str(e)}")
+            self.logger.error("Failed to get today's attendance summary: %s", e)
             return {
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': today_str(),
                 'total_scans': 0,
                 'status_breakdown': [],
                 'room_breakdown': [],
@@ -528,11 +1001,12 @@ class AttendanceManager:
             )
         
         except Exception as e:
-            self.logger.error(f"Failed to get student attendance history: {str(e)}")
+            self.logger.error("Failed to get student attendance history: %s", e)
             return []
     
     def get_room_attendance_report(self, room_id: int, 
-                                  start_date: str, end_date: str) -> Dict[str, Any]:
+                                  start_date: str, end_date: str,
+                                  include_records: bool = False) -> Dict[str, Any]:
         """
         Generate attendance report for a specific room and date range.
         
@@ -540,6 +1014,7 @@ class AttendanceManager:
             room_id (int): Room ID
             start_date (str): Start date (YYYY-MM-DD)
             end_date (str): End date (YYYY-MM-DD)
+            include_records (bool): Also return the individual attendance records
         
         Returns:
             Dict[str, Any]: Room attendance report
@@ -550,58 +1025,90 @@ class AttendanceManager:
             if not room_info:
                 return {'error': 'Room not found'}
             
-            # Get attendance records for the date range
-            attendance_records = self.db.execute_query(
-                """SELECT a.*, s.student_id, s.first_name, s.last_name, 
-                          s.department, s.year_level, s.section,
-                          sub.subject_name, sub.subject_code
-                   FROM attendance a
-                   JOIN students s ON a.student_id = s.id
-                   LEFT JOIN subjects sub ON a.subject_id = sub.id
-                   WHERE a.room_id = ? AND a.scan_date BETWEEN ? AND ?
-                   ORDER BY a.scan_date DESC, a.scan_time DESC""",
+            # Aggregate in SQL rather than materializing every record
+            totals = self.db.execute_query(
+                """SELECT COUNT(*) as total_attendance, 
+                          COUNT(DISTINCT student_id) as unique_students
+                   FROM attendance
+                   WHERE room_id = ? AND scan_date BETWEEN ? AND ?""",
+                (room_id, start_date, end_date),
+                fetch_all=False
+            )
+            
+            daily_status_counts = self.db.execute_query(
+                """SELECT scan_date, status, COUNT(*) as count
+                   FROM attendance
+                   WHERE room_id = ? AND scan_date BETWEEN ? AND ?
+                   GROUP BY scan_date, status
+                   ORDER BY scan_date DESC""",
                 (room_id, start_date, end_date)
             )
             
-            # Calculate statistics
-            total_attendance = len(attendance_records)
-            unique_students = len(set(record['student_id'] for record in attendance_records))
-            
-            status_counts = {}
-            for record in attendance_records:
-                status = record['status']
-                status_counts[status] = status_counts.get(status, 0) + 1
-            
-            # Daily breakdown
-            daily_breakdown = {}
-            for record in attendance_records:
-                date = record['scan_date']
-                if date not in daily_breakdown:
-                    daily_breakdown[date] = {'total': 0, 'present': 0, 'late': 0}
+            # Fold the (date, status) groups into overall and daily counts
+            status_counts = Counter()
+            daily_breakdown = defaultdict(lambda: {'total': 0, 'present': 0, 'late': 0})
+            for row in daily_status_counts:
+                status = row['status']
+                status_counts[status] += row['count']
                 
-                daily_breakdown[date]['total'] += 1
-                if record['status'] in ['present', 'late']:
-                    daily_breakdown[date][record['status']] += 1
+                day = daily_breakdown[row['scan_date']]
+                day['total'] += row['count']
+                if status in ('present', 'late'):
+                    day[status] += row['count']
             
-            return {
+            report = {
                 'room_info': room_info,
                 'date_range': {
                     'start_date': start_date,
                     'end_date': end_date
                 },
                 'statistics': {
-                    'total_attendance': total_attendance,
-                    'unique_students': unique_students,
-                    'status_counts': status_counts
+                    'total_attendance': totals['total_attendance'],
+                    'unique_students': totals['unique_students'],
+                    'status_counts': dict(status_counts)
                 },
-                'daily_breakdown': daily_breakdown,
-                'attendance_records': attendance_records
+                'daily_breakdown': dict(daily_breakdown)
             }
+            
+            if include_records:
+                report['attendance_records'] = list(
+                    self.iter_room_attendance_records(room_id, start_date, end_date)
+                )
+            
+            return report
         
         except Exception as e:
-            self.logger.error(f"Failed to generate room attendance report: {str(e)}")
+            self.logger.error("Failed to generate room attendance report: %s", e)
             return {'error': str(e)}
     
+    def iter_room_attendance_records(self, room_id: int, 
+                                     start_date: str, end_date: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the attendance records for a room and date range.
+        
+        Rows are fetched in batches, so exports over long ranges do not
+        hold every record in memory at once.
+        
+        Args:
+            room_id (int): Room ID
+            start_date (str): Start date (YYYY-MM-DD)
+            end_date (str): End date (YYYY-MM-DD)
+        
+        Yields:
+            Dict[str, Any]: Attendance record with student and subject details
+        """
+        return self.db.execute_query_iter(
+            """SELECT a.*, s.student_id, s.first_name, s.last_name, 
+                      s.department, s.year_level, s.section,
+                      sub.subject_name, sub.subject_code
+               FROM attendance a
+               JOIN students s ON a.student_id = s.id
+               LEFT JOIN subjects sub ON a.subject_id = sub.id
+               WHERE a.room_id = ? AND a.scan_date BETWEEN ? AND ?
+               ORDER BY a.scan_date DESC, a.scan_time DESC""",
+            (room_id, start_date, end_date)
+        )
+    
     def update_attendance_status(self, attendance_id: int, new_status: str, 
                                 notes: str = None, updated_by: int = None) -> bool:
         """
@@ -618,13 +1125,12 @@ class AttendanceManager:
         """
         try:
             # Validate status
-            valid_statuses = [self.STATUS_PRESENT, self.STATUS_LATE, self.STATUS_ABSENT, self.STATUS_EXCUSED]
-            if new_status not in valid_statuses:
-                self.logger.error(f"Invalid attendance status: {new_status}")
+            if new_status not in self.VALID_STATUSES:
+                self.logger.error("Invalid attendance status: %s", new_status)
                 return False
             
             # Update attendance record
-            affected_rows = self.db.execute_update(
+            affected_rows = self.db.execute_modify(
                 """UPDATE attendance 
                    SET status = ?, notes = COALESCE(?, notes), 
                        updated_at = CURRENT_TIMESTAMP
@@ -633,14 +1139,14 @@ class AttendanceManager:
             )
             
             if affected_rows > 0:
-                self.logger.info(f"Attendance record {attendance_id} updated to status: {new_status}")
+                self.logger.info("Attendance record %s updated to status: %s", attendance_id, new_status)
                 return True
             else:
-                self.logger.warning(f"No attendance record found with ID: {attendance_id}")
+                self.logger.warning("No attendance record found with ID: %s", attendance_id)
                 return False
         
         except Exception as e:
-            self.logger.error(f"Failed to update attendance status: {str(e)}")
+            self.logger.error("Failed to update attendance status: %s", e)
             return False
     
     def get_attendance_trends(self, days: int = 30) -> Dict[str, Any]:
@@ -653,46 +1159,55 @@ class AttendanceManager:
         Returns:
             Dict[str, Any]: Attendance trends and analytics
         """
+        cached = self._trends_cache.get(days)
+        if cached and monotonic() - cached[0] < self.trends_cache_ttl:
+            return cached[1]
+        
         try:
-            start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            
-            # Daily attendance counts
-            daily_counts = self.db.execute_query(
-                """SELECT scan_date, COUNT(*) as daily_count,
-                          SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present_count,
-                          SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END) as late_count
-                   FROM attendance 
-                   WHERE scan_date BETWEEN ? AND ?
-                   GROUP BY scan_date
-                   ORDER BY scan_date""",
-                (start_date, end_date)
-            )
+            # Bucketing happens in SQLite's GROUP BY, so only the window is computed here
+            now = datetime.now()
+            start_date = (now - timedelta(days=days)).strftime('%Y-%m-%d')
+            end_date = now.strftime('%Y-%m-%d')
+            params = (start_date, end_date)
             
-            # Peak hours analysis
-            hourly_distribution = self.db.execute_query(
-                """SELECT CAST(SUBSTR(scan_time, 1, 2) AS INTEGER) as hour,
-                          COUNT(*) as scan_count
-                   FROM attendance 
-                   WHERE scan_date BETWEEN ? AND ?
-                   GROUP BY hour
-                   ORDER BY hour""",
-                (start_date, end_date)
-            )
-            
-            # Department trends
-            department_trends = self.db.execute_query(
-                """SELECT s.department, COUNT(a.id) as attendance_count,
-                          AVG(CASE WHEN a.status = 'late' THEN 1.0 ELSE 0.0 END) as late_rate
-                   FROM students s
-                   JOIN attendance a ON s.id = a.student_id
-                   WHERE a.scan_date BETWEEN ? AND ?
-                   GROUP BY s.department
-                   ORDER BY attendance_count DESC""",
-                (start_date, end_date)
-            )
+            # All three aggregates run on one pooled connection
+            with self.db.get_connection(readonly=True) as conn:
+                # Daily attendance counts
+                daily_counts = [dict(row) for row in conn.execute(
+                    """SELECT scan_date, COUNT(*) as daily_count,
+                              SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present_count,
+                              SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END) as late_count
+                       FROM attendance 
+                       WHERE scan_date BETWEEN ? AND ?
+                       GROUP BY scan_date
+                       ORDER BY scan_date""",
+                    params
+                )]
+                
+                # Peak hours analysis
+                hourly_distribution = [dict(row) for row in conn.execute(
+                    """SELECT CAST(SUBSTR(scan_time, 1, 2) AS INTEGER) as hour,
+                              COUNT(*) as scan_count
+                       FROM attendance 
+                       WHERE scan_date BETWEEN ? AND ?
+                       GROUP BY hour
+                       ORDER BY hour""",
+                    params
+                )]
+                
+                # Department trends
+                department_trends = [dict(row) for row in conn.execute(
+                    """SELECT s.department, COUNT(a.id) as attendance_count,
+                              AVG(CASE WHEN a.status = 'late' THEN 1.0 ELSE 0.0 END) as late_rate
+                       FROM students s
+                       JOIN attendance a ON s.id = a.student_id
+                       WHERE a.scan_date BETWEEN ? AND ?
+                       GROUP BY s.department
+                       ORDER BY attendance_count DESC""",
+                    params
+                )]
             
-            return {
+            trends = {
                 'date_range': {
                     'start_date': start_date,
                     'end_date': end_date,
@@ -702,9 +1217,11 @@ class AttendanceManager:
                 'hourly_distribution': hourly_distribution,
                 'department_trends': department_trends
             }
+            self._trends_cache[days] = (monotonic(), trends)
+            return trends
         
         except Exception as e:
-            self.logger.error(f"Failed to get attendance trends: {str(e)}")
+            self.logger.error("Failed to get attendance trends: %s", e)
             return {
                 'error': str(e),
                 'date_range': {
@@ -20,16 +20,73 @@ Features:
 
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import ClassVar, Dict, FrozenSet, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import logging
+import atexit
+import os
+import queue
+import threading
 import hashlib
+import heapq
+import json
 import secrets
 import re
+import string
 from dataclasses import dataclass
+from functools import cached_property
+import time
+from time import monotonic
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+# Argon2id with the OWASP baseline parameters, shared by login and database
+# seeding so every stored hash uses the same settings; werkzeug's PBKDF2 is
+# used when argon2-cffi is not installed and for verifying legacy hashes
+PASSWORD_HASHER = PasswordHasher(
+    time_cost=3, memory_cost=46 * 1024, parallelism=1, hash_len=32, salt_len=16
+) if ARGON2_AVAILABLE else None
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with Argon2id, or PBKDF2 if argon2-cffi is unavailable.
+    
+    Args:
+        password (str): Password to hash
+    
+    Returns:
+        str: Encoded password hash
+    """
+    if PASSWORD_HASHER:
+        return PASSWORD_HASHER.hash(password)
+    return generate_password_hash(password)
+
+# Password character classes, tested against the set of a password's characters
+_UPPER_SET = frozenset(string.ascii_uppercase)
+_LOWER_SET = frozenset(string.ascii_lowercase)
+_DIGIT_SET = frozenset(string.digits)
+_SPECIAL_SET = frozenset('!@#$%^&*(),.?":{}|<>')
+
+# Validation patterns, compiled once at import
+_RE_USERNAME = re.compile(r'^[a-zA-Z0-9_-]+$')
+_RE_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+class PasswordCheckUnavailable(Exception):
+    """Raised when the hashing pool is too busy to verify a password in time."""
 
 @dataclass
 class UserSession:
     """Data structure for user session information."""
+    # Declared by hand rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('user_id', 'username', 'user_type', 'full_name', 'login_time',
+                 'last_activity', 'ip_address', 'user_agent', 'is_active',
+                 'login_time_iso', 'last_activity_iso')
+    
     user_id: int
     username: str
     user_type: str
@@ -39,6 +96,21 @@ class UserSession:
     ip_address: str
     user_agent: str
     is_active: bool
+    
+    def __post_init__(self):
+        # Formatted once here and on activity, not on every session listing
+        self.login_time_iso = self.login_time.isoformat()
+        self.last_activity_iso = self.last_activity.isoformat()
+    
+    def touch(self, now: datetime) -> None:
+        """
+        Record activity on the session.
+        
+        Args:
+            now (datetime): Activity time
+        """
+        self.last_activity = now
+        self.last_activity_iso = now.isoformat()
 
 class AuthManager:
     """
@@ -46,64 +118,143 @@ class AuthManager:
     Handles user login, session management, and security controls.
     """
     
-    def __init__(self, database_manager):
+    # User types and permissions
+    USER_TYPES: ClassVar[Dict[str, str]] = {
+        'ADMIN': 'admin',
+        'PROFESSOR': 'professor',
+        'STAFF': 'staff',
+        'USER': 'user'
+    }
+    
+    # Permission levels, shared by every instance and used directly for
+    # membership checks
+    PERMISSIONS: ClassVar[Dict[str, FrozenSet[str]]] = {
+        'admin': frozenset({
+            'view_all_attendance', 'manage_users', 'manage_rooms', 
+            'manage_students', 'generate_reports', 'system_settings',
+            'view_analytics', 'manage_schedules', 'export_data'
+        }),
+        'professor': frozenset({
+            'view_assigned_rooms', 'view_student_attendance', 'generate_reports',
+            'mark_attendance', 'view_analytics', 'manage_schedules'
+        }),
+        'staff': frozenset({
+            'scan_qr_codes', 'view_basic_reports', 'mark_attendance'
+        }),
+        'user': frozenset({
+            'view_own_attendance', 'scan_qr_codes'
+        })
+    }
+    
+    # Security settings
+    security_config: ClassVar[Dict[str, Any]] = {
+        'password_min_length': 8,
+        'password_require_uppercase': True,
+        'password_require_lowercase': True,
+        'password_require_numbers': True,
+        'password_require_special': True,
+        'max_login_attempts': 5,
+        'lockout_duration_minutes': 30,
+        'session_timeout_minutes': 60,
+        'password_history_count': 5,
+        'password_hash_workers': max(1, (os.cpu_count() or 2) // 2),
+        'password_hash_timeout_seconds': 2
+    }
+    
+    def __init__(self, database_manager, redis_client=None):
         """
         Initialize the authentication manager with database connection.
         
         Args:
             database_manager: Database manager instance
+            redis_client: Optional Redis client for sessions and lockouts shared
+                          across worker processes
         """
         self.db = database_manager
+        self.redis = redis_client
         self.logger = logging.getLogger(__name__)
         
-        # User types and permissions
-        self.USER_TYPES = {
-            'ADMIN': 'admin',
-            'PROFESSOR': 'professor',
-            'STAFF': 'staff',
-            'USER': 'user'
-        }
-        
-        # Permission levels
-        self.PERMISSIONS = {
-            'admin': [
-                'view_all_attendance', 'manage_users', 'manage_rooms', 
-                'manage_students', 'generate_reports', 'system_settings',
-                'view_analytics', 'manage_schedules', 'export_data'
-            ],
-            'professor': [
-                'view_assigned_rooms', 'view_student_attendance', 'generate_reports',
-                'mark_attendance', 'view_analytics', 'manage_schedules'
-            ],
-            'staff': [
-                'scan_qr_codes', 'view_basic_reports', 'mark_attendance'
-            ],
-            'user': [
-                'view_own_attendance', 'scan_qr_codes'
-            ]
-        }
-        
-        # Security settings
-        self.security_config = {
-            'password_min_length': 8,
-            'password_require_uppercase': True,
-            'password_require_lowercase': True,
-            'password_require_numbers': True,
-            'password_require_special': True,
-            'max_login_attempts': 5,
-            'lockout_duration_minutes': 30,
-            'session_timeout_minutes': 60,
-            'password_history_count': 5
-        }
-        
-        # Active sessions cache
+        self._hasher = PASSWORD_HASHER
+        
+        # Password hash checks are deliberately slow; run them on a bounded pool
+        # so a burst of logins cannot occupy every core serving scans
+        self._hash_executor = ThreadPoolExecutor(
+            max_workers=self.security_config['password_hash_workers'],
+            thread_name_prefix='password-hash'
+        )
+        
+        # Dashboard professor count, dropped when professors are added or removed
+        self.professor_count_ttl = 60  # Seconds
+        self._professor_count_cache = (None, 0.0)  # (count, cached_at)
+        
+        # Active sessions and failed login attempts live in Redis when available,
+        # expiring through key TTLs; otherwise they are tracked per process
+        self.SESSION_KEY = 'session:{}'
+        self.FAILED_ATTEMPTS_KEY = 'failed:{}'
         self.active_sessions = {}
+        self.failed_attempts = {}  # username -> (last attempt epoch seconds << 8) | count
+        
+        # (expiry time, user_id) for in-process sessions; entries made stale by
+        # later activity are skipped when popped
+        self._expiry_heap = []
         
-        # Failed login attempts tracking
-        self.failed_attempts = {}
+        # Pending security audit events when the audit queue is enabled
+        self._audit_queue = None
         
         self.logger.info("Authentication manager initialized")
     
+    def enable_audit_queue(self, batch_size: int = 100, flush_interval: float = 0.5,
+                           max_pending: int = 10000) -> None:
+        """
+        Write login audit events through a background thread.
+        
+        Events are queued on the request thread and logged and inserted into
+        security_audit in batches, one transaction per batch. When the queue
+        is full the oldest pending event is dropped so logins never block on
+        audit I/O.
+        
+        Args:
+            batch_size (int): Maximum events written per transaction
+            flush_interval (float): Seconds to wait for more events before writing
+            max_pending (int): Maximum queued events
+        """
+        if self._audit_queue is not None:
+            return
+        
+        self._audit_queue = queue.Queue(maxsize=max_pending)
+        self._audit_writer = threading.Thread(
+            target=self._write_queued_audit_events,
+            args=(batch_size, flush_interval),
+            daemon=True
+        )
+        self._audit_writer.start()
+        
+        # Let queued events reach the database before the interpreter exits
+        atexit.register(self._audit_queue.join)
+        
+        self.logger.info("Security audit queue enabled")
+    
+    def _write_queued_audit_events(self, batch_size: int, flush_interval: float) -> None:
+        """Background thread that drains the audit queue in batches."""
+        while True:
+            batch = [self._audit_queue.get()]
+            deadline = monotonic() + flush_interval
+            
+            while len(batch) < batch_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._audit_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                self._write_audit_events(batch)
+            finally:
+                for _ in batch:
+                    self._audit_queue.task_done()
+    
     def authenticate_user(self, username: str, password: str, 
                          ip_address: str = None, user_agent: str = None) -> Optional[Dict[str, Any]]:
         """
@@ -117,61 +268,80 @@ class AuthManager:
         
         Returns:
             Dict[str, Any]: User information if authenticated, None otherwise
+        
+        Raises:
+            PasswordCheckUnavailable: If the password could not be checked in
+                time; no failed attempt is recorded, the caller should retry
         """
         try:
             # Check if account is locked
             if self._is_account_locked(username):
-                self.logger.warning(f"Authentication attempt for locked account: {username}")
+                self.logger.warning("Authentication attempt for locked account: %s", username)
                 return None
             
             # Get user from database
-            user = self.db.execute_query(
-                "SELECT * FROM users WHERE username = ? AND is_active = 1",
-                (username,),
-                fetch_all=False
+            user = self._get_active_user(username)
+            
+            # Unknown usernames are checked against a dummy hash so they take as
+            # long to reject as a wrong password and cannot be enumerated by timing
+            password_valid = self._verify_password(
+                user[2] if user else self._dummy_password_hash, password
             )
             
             if not user:
                 self._record_failed_attempt(username, ip_address)
-                self.logger.warning(f"Authentication failed - user not found: {username}")
+                self.logger.warning("Authentication failed - user not found: %s", username)
                 return None
             
             # Verify password
-            if not check_password_hash(user['password_hash'], password):
+            if not password_valid:
                 self._record_failed_attempt(username, ip_address)
-                self.logger.warning(f"Authentication failed - invalid password: {username}")
+                self.logger.warning("Authentication failed - invalid password: %s", username)
                 return None
             
+            # Columns come back in the fixed SELECT order of _get_active_user
+            user_id, user_name, password_hash, full_name, email, user_type, department = user
+            
+            # Upgrade legacy or outdated hashes while the plaintext is at hand
+            if self._password_needs_rehash(password_hash):
+                self._rehash_password(user_id, password)
+            
             # Clear failed attempts on successful login
             self._clear_failed_attempts(username)
             
             # Create user session
-            session = self._create_user_session(user, ip_address, user_agent)
+            session = self._create_user_session(
+                {'id': user_id, 'username': user_name, 'user_type': user_type, 'full_name': full_name},
+                ip_address, user_agent
+            )
             
             # Log successful login
-            self._log_login_event(user['id'], True, ip_address, user_agent)
+            self._log_login_event(user_id, True, ip_address, user_agent, user_name)
             
             # Update last login time
-            self.db.execute_update(
+            self.db.execute_modify(
                 "UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (user['id'],)
+                (user_id,)
             )
             
-            self.logger.info(f"User authenticated successfully: {username}")
+            self.logger.info("User authenticated successfully: %s", username)
             
             return {
-                'id': user['id'],
-                'username': user['username'],
-                'full_name': user['full_name'],
-                'email': user['email'],
-                'user_type': user['user_type'],
-                'department': user['department'],
+                'id': user_id,
+                'username': user_name,
+                'full_name': full_name,
+                'email': email,
+                'user_type': user_type,
+                'department': department,
                 'session_id': session.user_id,
-                'permissions': self.get_user_permissions(user['user_type'])
+                'permissions': self.get_user_permissions(user_type)
             }
         
+        except PasswordCheckUnavailable:
+            raise
+        
         except Exception as e:
-            self.logger.error(f"Authentication error for user {username}: {str(e)}")
+            self.logger.error("Authentication error for user %s: %s", username, e)
             return None
     
     def create_user(self, username: str, password: str, full_name: str,
@@ -201,45 +371,43 @@ class AuthManager:
                     'error': validation_result['error']
                 }
             
-            # Check if username already exists
-            existing_user = self.db.execute_query(
-                "SELECT id FROM users WHERE username = ?",
-                (username,),
+            # Check if username or email already exists; username_taken is NULL
+            # when neither is, 1 for a username match and 0 for an email-only match
+            existing = self.db.execute_query(
+                """SELECT MAX(username = ?) as username_taken FROM users 
+                   WHERE username = ? OR email = ?""",
+                (username, username, email),
                 fetch_all=False
             )
             
-            if existing_user:
+            if existing['username_taken']:
                 return {
                     'success': False,
                     'error': 'Username already exists'
                 }
             
-            # Check if email already exists
-            existing_email = self.db.execute_query(
-                "SELECT id FROM users WHERE email = ?",
-                (email,),
-                fetch_all=False
-            )
-            
-            if existing_email:
+            if existing['username_taken'] is not None:
                 return {
                     'success': False,
                     'error': 'Email address already exists'
                 }
             
             # Hash password
-            password_hash = generate_password_hash(password)
+            password_hash = self._hash_password(password)
             
             # Insert new user
-            user_id = self.db.execute_update(
+            user_id = self.db.execute_insert(
                 """INSERT INTO users (username, password_hash, full_name, email, 
                                     user_type, department, created_at, updated_at)
                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
                 (username, password_hash, full_name, email, user_type, department)
             )
             
+            if user_type == self.USER_TYPES['PROFESSOR']:
+                self._professor_count_cache = (None, 0.0)
+            
             # Log user creation
-            self.logger.info(f"User created successfully: {username} (ID: {user_id})")
+            self.logger.info("User created successfully: %s (ID: %s)", username, user_id)
             
             return {
                 'success': True,
@@ -249,7 +417,7 @@ class AuthManager:
             }
         
         except Exception as e:
-            self.logger.error(f"User creation failed for {username}: {str(e)}")
+            self.logger.error("User creation failed for %s: %s", username, e)
             return {
                 'success': False,
                 'error': 'Failed to create user account'
@@ -270,10 +438,9 @@ class AuthManager:
         """
         try:
             # Get user information
-            user = self.db.execute_query(
-                "SELECT * FROM users WHERE id = ? AND is_active = 1",
-                (user_id,),
-                fetch_all=False
+            user = self.db.execute_query_row(
+                "SELECT password_hash FROM users WHERE id = ? AND is_active = 1",
+                (user_id,)
             )
             
             if not user:
@@ -283,8 +450,9 @@ class AuthManager:
                 }
             
             # Verify current password
-            if not check_password_hash(user['password_hash'], current_password):
-                self.logger.warning(f"Password update failed - incorrect current password for user {user_id}")
+            (current_hash,) = user
+            if not self._verify_password(current_hash, current_password):
+                self.logger.warning("Password update failed - incorrect current password for user %s", user_id)
                 return {
                     'success': False,
                     'error': 'Current password is incorrect'
@@ -306,19 +474,19 @@ class AuthManager:
                 }
             
             # Hash new password
-            new_password_hash = generate_password_hash(new_password)
+            new_password_hash = self._hash_password(new_password)
             
             # Update password in database
-            affected_rows = self.db.execute_update(
+            affected_rows = self.db.execute_modify(
                 "UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (new_password_hash, user_id)
             )
             
             if affected_rows > 0:
                 # Store in password history (if implemented)
-                self._store_password_history(user_id, user['password_hash'])
+                self._store_password_history(user_id, current_hash)
                 
-                self.logger.info(f"Password updated successfully for user {user_id}")
+                self.logger.info("Password updated successfully for user %s", user_id)
                 return {
                     'success': True,
                     'message': 'Password updated successfully'
@@ -329,13 +497,133 @@ class AuthManager:
                     'error': 'Failed to update password'
                 }
         
+        except PasswordCheckUnavailable:
+            return {
+                'success': False,
+                'error': 'The server is busy, please try again'
+            }
+        
         except Exception as e:
-            self.logger.error(f"Password update failed for user {user_id}: {str(e)}")
+            self.logger.error("Password update failed for user %s: %s", user_id, e)
             return {
                 'success': False,
                 'error': 'Failed to update password'
             }
     
+    def _verify_password(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against its stored hash on the hashing pool.
+        
+        Args:
+            password_hash (str): Stored password hash
+            password (str): Password to verify
+        
+        Returns:
+            bool: True if the password matches, False otherwise
+        
+        Raises:
+            PasswordCheckUnavailable: If the pool did not finish the check in time
+        """
+        future = self._hash_executor.submit(self._check_password_hash, password_hash, password)
+        try:
+            return future.result(timeout=self.security_config['password_hash_timeout_seconds'])
+        except FutureTimeoutError:
+            # Drop the check if it has not started so it does not add to the backlog
+            future.cancel()
+            self.logger.warning("Password verification timed out; hashing pool is saturated")
+            raise PasswordCheckUnavailable("Password verification timed out")
+    
+    @cached_property
+    def _dummy_password_hash(self) -> str:
+        """Hash of a random password, verified in place of unknown users' hashes."""
+        return self._hash_password(secrets.token_urlsafe(32))
+    
+    def _hash_password(self, password: str) -> str:
+        """
+        Hash a password with the shared password hasher.
+        
+        Args:
+            password (str): Password to hash
+        
+        Returns:
+            str: Encoded password hash
+        """
+        return hash_password(password)
+    
+    def _check_password_hash(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against an Argon2 or werkzeug hash.
+        
+        Args:
+            password_hash (str): Stored password hash
+            password (str): Password to verify
+        
+        Returns:
+            bool: True if the password matches
+        """
+        if password_hash.startswith('$argon2'):
+            if not self._hasher:
+                self.logger.error("Cannot verify Argon2 password hash: argon2-cffi is not installed")
+                return False
+            try:
+                return self._hasher.verify(password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return check_password_hash(password_hash, password)
+    
+    def _password_needs_rehash(self, password_hash: str) -> bool:
+        """
+        Check if a stored hash predates the current hashing parameters.
+        
+        Args:
+            password_hash (str): Stored password hash
+        
+        Returns:
+            bool: True if the hash should be regenerated
+        """
+        if not self._hasher:
+            return False
+        if not password_hash.startswith('$argon2'):
+            return True
+        return self._hasher.check_needs_rehash(password_hash)
+    
+    def _rehash_password(self, user_id: int, password: str) -> None:
+        """
+        Replace a user's stored hash with one using the current parameters.
+        
+        Args:
+            user_id (int): User ID
+            password (str): Verified plaintext password
+        """
+        try:
+            self.db.execute_modify(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (self._hash_password(password), user_id)
+            )
+            self.logger.info("Password hash upgraded for user %s", user_id)
+        except Exception as e:
+            self.logger.error("Failed to upgrade password hash for user %s: %s", user_id, e)
+    
+    def _get_active_user(self, username: str) -> Optional[Tuple]:
+        """
+        Get an active user by username.
+        
+        Always read from the database: the password hash and active flag must
+        reflect changes made by any worker process.
+        
+        Args:
+            username (str): Username
+        
+        Returns:
+            Tuple: (id, username, password_hash, full_name, email, user_type,
+                department) or None
+        """
+        return self.db.execute_query_row(
+            """SELECT id, username, password_hash, full_name, email, user_type, department
+               FROM users WHERE username = ? AND is_active = 1""",
+            (username,)
+        )
+    
     def get_user_permissions(self, user_type: str) -> List[str]:
         """
         Get permissions for user type.
@@ -344,9 +632,9 @@ class AuthManager:
             user_type (str): User type
         
         Returns:
-            List[str]: List of permissions
+            List[str]: Sorted permissions, safe to JSON-encode or store in a session
         """
-        return self.PERMISSIONS.get(user_type, self.PERMISSIONS['user'])
+        return sorted(self.PERMISSIONS.get(user_type, self.PERMISSIONS['user']))
     
     def has_permission(self, user_type: str, permission: str) -> bool:
         """
@@ -359,15 +647,17 @@ class AuthManager:
         Returns:
             bool: True if user has permission
         """
-        user_permissions = self.get_user_permissions(user_type)
-        return permission in user_permissions
+        return permission in self.PERMISSIONS.get(user_type, self.PERMISSIONS['user'])
     
-    def get_all_users(self, include_inactive: bool = False) -> List[Dict[str, Any]]:
+    def get_all_users(self, include_inactive: bool = False, 
+                     limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Get all users in the system.
         
         Args:
             include_inactive (bool): Include inactive users
+            limit (int): Maximum number of users to return, or None for all
+            offset (int): Number of users to skip
         
         Returns:
             List[Dict[str, Any]]: List of users
@@ -375,16 +665,18 @@ class AuthManager:
         try:
             where_clause = "" if include_inactive else "WHERE is_active = 1"
             
+            # Ordered by the idx_users_listing indexes, so pages need no sort
             return self.db.execute_query(f"""
                 SELECT id, username, full_name, email, user_type, department, 
                        is_active, created_at, updated_at
                 FROM users 
                 {where_clause}
                 ORDER BY user_type, full_name
-            """)
+                LIMIT ? OFFSET ?
+            """, (-1 if limit is None else limit, offset))
         
         except Exception as e:
-            self.logger.error(f"Failed to get users: {str(e)}")
+            self.logger.error("Failed to get users: %s", e)
             return []
     
     def get_professor_count(self) -> int:
@@ -394,15 +686,21 @@ class AuthManager:
         Returns:
             int: Number of professors
         """
+        count, cached_at = self._professor_count_cache
+        if count is not None and monotonic() - cached_at < self.professor_count_ttl:
+            return count
+        
         try:
             result = self.db.execute_query(
                 "SELECT COUNT(*) as count FROM users WHERE user_type = 'professor' AND is_active = 1",
                 fetch_all=False
             )
-            return result['count'] if result else 0
+            count = result['count'] if result else 0
+            self._professor_count_cache = (count, monotonic())
+            return count
         
         except Exception as e:
-            self.logger.error(f"Failed to get professor count: {str(e)}")
+            self.logger.error("Failed to get professor count: %s", e)
             return 0
     
     def deactivate_user(self, user_id: int, deactivated_by: int = None) -> bool:
@@ -417,23 +715,25 @@ class AuthManager:
             bool: Success status
         """
         try:
-            affected_rows = self.db.execute_update(
+            affected_rows = self.db.execute_modify(
                 "UPDATE users SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (user_id,)
             )
             
             if affected_rows > 0:
+                # The deactivated user may have been a professor
+                self._professor_count_cache = (None, 0.0)
+                
                 # Remove from active sessions
-                if user_id in self.active_sessions:
-                    del self.active_sessions[user_id]
+                self.terminate_session(user_id)
                 
-                self.logger.info(f"User {user_id} deactivated by {deactivated_by}")
+                self.logger.info("User %s deactivated by %s", user_id, deactivated_by)
                 return True
             
             return False
         
         except Exception as e:
-            self.logger.error(f"Failed to deactivate user {user_id}: {str(e)}")
+            self.logger.error("Failed to deactivate user %s: %s", user_id, e)
             return False
     
     def _validate_user_data(self, username: str, password: str, email: str) -> Dict[str, Any]:
@@ -452,7 +752,7 @@ class AuthManager:
         if not username or len(username) < 3:
             return {'valid': False, 'error': 'Username must be at least 3 characters long'}
         
-        if not re.match(r'^[a-zA-Z0-9_-]+$', username):
+        if not _RE_USERNAME.match(username):
             return {'valid': False, 'error': 'Username can only contain letters, numbers, hyphens, and underscores'}
         
         # Validate password
@@ -461,8 +761,7 @@ class AuthManager:
             return password_validation
         
         # Validate email
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
+        if not _RE_EMAIL.match(email):
             return {'valid': False, 'error': 'Invalid email address format'}
         
         return {'valid': True}
@@ -483,16 +782,18 @@ class AuthManager:
         if len(password) < self.security_config['password_min_length']:
             return {'valid': False, 'error': f'Password must be at least {self.security_config["password_min_length"]} characters long'}
         
-        if self.security_config['password_require_uppercase'] and not re.search(r'[A-Z]', password):
+        characters = set(password)
+        
+        if self.security_config['password_require_uppercase'] and characters.isdisjoint(_UPPER_SET):
             return {'valid': False, 'error': 'Password must contain at least one uppercase letter'}
         
-        if self.security_config['password_require_lowercase'] and not re.search(r'[a-z]', password):
+        if self.security_config['password_require_lowercase'] and characters.isdisjoint(_LOWER_SET):
             return {'valid': False, 'error': 'Password must contain at least one lowercase letter'}
         
-        if self.security_config['password_require_numbers'] and not re.search(r'\d', password):
+        if self.security_config['password_require_numbers'] and characters.isdisjoint(_DIGIT_SET):
             return {'valid': False, 'error': 'Password must contain at least one number'}
         
-        if self.security_config['password_require_special'] and not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if self.security_config['password_require_special'] and characters.isdisjoint(_SPECIAL_SET):
             return {'valid': False, 'error': 'Password must contain at least one special character'}
         
         return {'valid': True}
@@ -507,19 +808,22 @@ class AuthManager:
         Returns:
             bool: True if account is locked
         """
-        if username not in self.failed_attempts:
-            return False
+        if self.redis:
+            attempts = self.redis.get(self.FAILED_ATTEMPTS_KEY.format(username))
+            return int(attempts or 0) >= self.security_config['max_login_attempts']
         
-        attempt_data = self.failed_attempts[username]
+        packed = self.failed_attempts.get(username)
+        if not packed:
+            return False
         
         # Check if lockout period has expired
-        if datetime.now() - attempt_data['last_attempt'] > timedelta(minutes=self.security_config['lockout_duration_minutes']):
+        if time.time() - (packed >> 8) > self.security_config['lockout_duration_minutes'] * 60:
             # Clear expired lockout
-            del self.failed_attempts[username]
+            self.failed_attempts.pop(username, None)
             return False
         
         # Check if max attempts exceeded
-        return attempt_data['count'] >= self.security_config['max_login_attempts']
+        return packed & 0xFF >= self.security_config['max_login_attempts']
     
     def _record_failed_attempt(self, username: str, ip_address: str = None) -> None:
         """
@@ -529,14 +833,21 @@ class AuthManager:
             username (str): Username
             ip_address (str): Client IP address
         """
-        if username not in self.failed_attempts:
-            self.failed_attempts[username] = {'count': 0, 'last_attempt': datetime.now()}
-        
-        self.failed_attempts[username]['count'] += 1
-        self.failed_attempts[username]['last_attempt'] = datetime.now()
-        
-        # Log failed attempt
-        self.logger.warning(f"Failed login attempt {self.failed_attempts[username]['count']} for {username} from {ip_address}")
+        if self.redis:
+            # The lockout window restarts with every failed attempt
+            key = self.FAILED_ATTEMPTS_KEY.format(username)
+            pipe = self.redis.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, self.security_config['lockout_duration_minutes'] * 60)
+            attempts = pipe.execute()[0]
+        else:
+            attempts = min((self.failed_attempts.get(username, 0) & 0xFF) + 1, 0xFF)
+            self.failed_attempts[username] = (int(time.time()) << 8) | attempts
+        
+        # Audit the failed attempt; the count only matters once it locks the account
+        self._log_login_event(None, False, ip_address, username=username)
+        if attempts >= self.security_config['max_login_attempts']:
+            self.logger.warning("Account locked after %d failed attempts: %s", attempts, username)
     
     def _clear_failed_attempts(self, username: str) -> None:
         """
@@ -545,7 +856,9 @@ class AuthManager:
         Args:
             username (str): Username
         """
-        if username in self.failed_attempts:
+        if self.redis:
+            self.redis.delete(self.FAILED_ATTEMPTS_KEY.format(username))
+        elif username in self.failed_attempts:
             del self.failed_attempts[username]
     
     def _create_user_session(self, user: Dict[str, Any], ip_address: str = None, 
@@ -561,45 +874,95 @@ class AuthManager:
         Returns:
             UserSession: Created session
         """
+        now = datetime.now()
         session = UserSession(
             user_id=user['id'],
             username=user['username'],
             user_type=user['user_type'],
             full_name=user['full_name'],
-            login_time=datetime.now(),
-            last_activity=datetime.now(),
+            login_time=now,
+            last_activity=now,
             ip_address=ip_address or 'unknown',
             user_agent=user_agent or 'unknown',
             is_active=True
         )
         
-        self.active_sessions[user['id']] = session
+        if self.redis:
+            self.redis.set(
+                self.SESSION_KEY.format(session.user_id),
+                json.dumps({
+                    'user_id': session.user_id,
+                    'username': session.username,
+                    'user_type': session.user_type,
+                    'full_name': session.full_name,
+                    'login_time': session.login_time.isoformat(),
+                    'ip_address': session.ip_address,
+                    'user_agent': session.user_agent
+                }),
+                ex=self.security_config['session_timeout_minutes'] * 60
+            )
+        else:
+            self.active_sessions[user['id']] = session
+            heapq.heappush(self._expiry_heap, (now + self._session_timeout(), session.user_id))
         return session
     
-    def _log_login_event(self, user_id: int, success: bool, ip_address: str = None, 
-                        user_agent: str = None) -> None:
+    def _log_login_event(self, user_id: Optional[int], success: bool, ip_address: str = None, 
+                        user_agent: str = None, username: str = None) -> None:
         """
         Log login event for security audit.
         
         Args:
-            user_id (int): User ID
+            user_id (int): User ID, or None if the username is unknown
             success (bool): Login success status
             ip_address (str): Client IP address
             user_agent (str): Client user agent
+            username (str): Username the login was attempted for
         """
+        event = (user_id, username, 'login', int(success), ip_address, user_agent,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        if self._audit_queue is None:
+            self._write_audit_events([event])
+            return
+        
         try:
-            # In production, this would log to a security audit table
-            log_message = f"Login {'successful' if success else 'failed'} for user {user_id}"
-            if ip_address:
-                log_message += f" from {ip_address}"
+            self._audit_queue.put_nowait(event)
+        except queue.Full:
+            # Drop the oldest pending event rather than stall the login
+            try:
+                self._audit_queue.get_nowait()
+                self._audit_queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self._audit_queue.put_nowait(event)
+            except queue.Full:
+                self.logger.warning("Security audit queue full, dropped login event for %s", username)
+    
+    def _write_audit_events(self, events: List[Tuple]) -> None:
+        """
+        Log audit events and store them in the security_audit table.
+        
+        Args:
+            events (List[Tuple]): Audit event rows
+        """
+        try:
+            for user_id, username, _, success, ip_address, _, _ in events:
+                level = logging.INFO if success else logging.WARNING
+                self.logger.log(level, "Login %s for user %s from %s",
+                                'successful' if success else 'failed',
+                                user_id if user_id is not None else username,
+                                ip_address or 'unknown')
             
-            if success:
-                self.logger.info(log_message)
-            else:
-                self.logger.warning(log_message)
+            self.db.execute_many(
+                """INSERT INTO security_audit
+                   (user_id, username, event_type, success, ip_address, user_agent, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                events
+            )
         
         except Exception as e:
-            self.logger.error(f"Failed to log login event: {str(e)}")
+            self.logger.error("Failed to write %s security audit events: %s", len(events), e)
     
     def _is_password_in_history(self, user_id: int, new_password: str) -> bool:
         """
@@ -634,8 +997,14 @@ class AuthManager:
         Args:
             user_id (int): User ID
         """
-        if user_id in self.active_sessions:
-            self.active_sessions[user_id].last_activity = datetime.now()
+        if self.redis:
+            # Activity is recorded by pushing the session expiry forward
+            self.redis.expire(self.SESSION_KEY.format(user_id),
+                              self.security_config['session_timeout_minutes'] * 60)
+        elif user_id in self.active_sessions:
+            now = datetime.now()
+            self.active_sessions[user_id].touch(now)
+            heapq.heappush(self._expiry_heap, (now + self._session_timeout(), user_id))
     
     def is_session_valid(self, user_id: int) -> bool:
         """
@@ -647,6 +1016,9 @@ class AuthManager:
         Returns:
             bool: True if session is valid
         """
+        if self.redis:
+            return bool(self.redis.exists(self.SESSION_KEY.format(user_id)))
+        
         if user_id not in self.active_sessions:
             return False
         
@@ -672,15 +1044,19 @@ class AuthManager:
             bool: Success status
         """
         try:
-            if user_id in self.active_sessions:
-                del self.active_sessions[user_id]
-                self.logger.info(f"Session terminated for user {user_id}")
+            if self.redis:
+                terminated = bool(self.redis.delete(self.SESSION_KEY.format(user_id)))
+            else:
+                terminated = self.active_sessions.pop(user_id, None) is not None
+            
+            if terminated:
+                self.logger.info("Session terminated for user %s", user_id)
                 return True
             
             return False
         
         except Exception as e:
-            self.logger.error(f"Failed to terminate session for user {user_id}: {str(e)}")
+            self.logger.error("Failed to terminate session for user %s: %s", user_id, e)
             return False
     
     def get_active_sessions(self) -> List[Dict[str, Any]]:
@@ -691,30 +1067,89 @@ class AuthManager:
             List[Dict[str, Any]]: Active sessions
         """
         try:
+            if self.redis:
+                return self._get_redis_sessions()
+            
             active_sessions = []
             current_time = datetime.now()
+            self._purge_expired_sessions(current_time)
             
-            for user_id, session in list(self.active_sessions.items()):
-                # Check if session is still valid
-                timeout_delta = timedelta(minutes=self.security_config['session_timeout_minutes'])
-                if current_time - session.last_activity > timeout_delta:
-                    # Remove expired session
-                    del self.active_sessions[user_id]
-                    continue
-                
+            for session in list(self.active_sessions.values()):
                 active_sessions.append({
                     'user_id': session.user_id,
                     'username': session.username,
                     'full_name': session.full_name,
                     'user_type': session.user_type,
-                    'login_time': session.login_time.isoformat(),
-                    'last_activity': session.last_activity.isoformat(),
+                    'login_time': session.login_time_iso,
+                    'last_activity': session.last_activity_iso,
                     'ip_address': session.ip_address,
-                    'session_duration': str(current_time - session.login_time)
+                    'session_duration_s': int((current_time - session.login_time).total_seconds())
                 })
             
             return active_sessions
         
         except Exception as e:
-            self.logger.error(f"Failed to get active sessions: {str(e)}")
-            return []
\ No newline at end of file
+            self.logger.error("Failed to get active sessions: %s", e)
+            return []
+    
+    def _session_timeout(self) -> timedelta:
+        """Inactivity period after which a session expires."""
+        return timedelta(minutes=self.security_config['session_timeout_minutes'])
+    
+    def _purge_expired_sessions(self, now: datetime) -> None:
+        """
+        Remove expired in-process sessions, visiting only heap entries that are due.
+        
+        Args:
+            now (datetime): Current time
+        """
+        timeout_delta = self._session_timeout()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, user_id = heapq.heappop(self._expiry_heap)
+            session = self.active_sessions.get(user_id)
+            if session and now - session.last_activity > timeout_delta:
+                self.active_sessions.pop(user_id, None)
+    
+    def _get_redis_sessions(self) -> List[Dict[str, Any]]:
+        """
+        Get active sessions stored in Redis.
+        
+        Expired sessions have already been removed by their TTL. The last
+        activity time is derived from the remaining TTL, since each activity
+        resets it to the full session timeout.
+        
+        Returns:
+            List[Dict[str, Any]]: Active sessions
+        """
+        keys = list(self.redis.scan_iter(match=self.SESSION_KEY.format('*')))
+        if not keys:
+            return []
+        
+        pipe = self.redis.pipeline()
+        for key in keys:
+            pipe.get(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+        
+        timeout_seconds = self.security_config['session_timeout_minutes'] * 60
+        current_time = datetime.now()
+        active_sessions = []
+        for data, ttl in zip(results[::2], results[1::2]):
+            if data is None:
+                continue
+            
+            session = json.loads(data)
+            login_time = datetime.fromisoformat(session['login_time'])
+            last_activity = max(login_time, current_time - timedelta(seconds=max(0, timeout_seconds - ttl)))
+            active_sessions.append({
+                'user_id': session['user_id'],
+                'username': session['username'],
+                'full_name': session['full_name'],
+                'user_type': session['user_type'],
+                'login_time': session['login_time'],
+                'last_activity': last_activity.isoformat(),
+                'ip_address': session['ip_address'],
+                'session_duration_s': int((current_time - login_time).total_seconds())
+            })
+        
+        return active_sessions
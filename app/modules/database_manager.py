@@ -20,12 +20,194 @@ Features:
 
 import sqlite3
 import logging
+import atexit
+import weakref
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from itertools import islice
 import threading
-from werkzeug.security import generate_password_hash
+import queue
 import json
 import os
+from pathlib import Path
+from time import monotonic
+from app.modules.auth_manager import hash_password
+from app.modules.date_utils import today_str
+
+# Hot lookups share one SQL string so they always hit the statement cache
+_SQL_GET_SETTING = "SELECT setting_value FROM system_settings WHERE setting_key = ?"
+
+# Schema for the attendance system; every statement is idempotent
+_SCHEMA_SQL = """
+-- Create users table (professors, admins, staff)
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    full_name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    user_type VARCHAR(20) DEFAULT 'user',
+    department VARCHAR(100),
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create students table
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id VARCHAR(20) UNIQUE NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    middle_name VARCHAR(50),
+    department VARCHAR(100) NOT NULL,
+    year_level INTEGER NOT NULL,
+    section VARCHAR(10) NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    phone VARCHAR(20),
+    qr_code VARCHAR(255) UNIQUE NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create rooms table
+CREATE TABLE IF NOT EXISTS rooms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_code VARCHAR(20) UNIQUE NOT NULL,
+    room_name VARCHAR(100) NOT NULL,
+    building VARCHAR(100),
+    floor INTEGER,
+    capacity INTEGER DEFAULT 0,
+    room_type VARCHAR(50) DEFAULT 'classroom',
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create subjects table
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_code VARCHAR(20) UNIQUE NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    description TEXT,
+    units INTEGER DEFAULT 3,
+    professor_id INTEGER,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (professor_id) REFERENCES users(id)
+);
+
+-- Create attendance table
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    room_id INTEGER NOT NULL,
+    subject_id INTEGER,
+    scan_date DATE NOT NULL,
+    scan_time TIME NOT NULL,
+    status VARCHAR(20) DEFAULT 'present',
+    notes TEXT,
+    scanned_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(id),
+    FOREIGN KEY (room_id) REFERENCES rooms(id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id),
+    FOREIGN KEY (scanned_by) REFERENCES users(id),
+    UNIQUE(student_id, room_id, scan_date)
+);
+
+-- Create room_assignments table (which professor is assigned to which room)
+CREATE TABLE IF NOT EXISTS room_assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    professor_id INTEGER NOT NULL,
+    room_id INTEGER NOT NULL,
+    subject_id INTEGER,
+    day_of_week INTEGER NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (professor_id) REFERENCES users(id),
+    FOREIGN KEY (room_id) REFERENCES rooms(id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id)
+);
+
+-- Create notifications table
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    title VARCHAR(100) NOT NULL,
+    message TEXT NOT NULL,
+    type VARCHAR(50) DEFAULT 'info',
+    is_read BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Create security_audit table (login events written in batches
+-- by the authentication manager)
+CREATE TABLE IF NOT EXISTS security_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    username VARCHAR(50),
+    event_type VARCHAR(50) NOT NULL,
+    success BOOLEAN NOT NULL,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Create system_settings table
+CREATE TABLE IF NOT EXISTS system_settings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    setting_key VARCHAR(100) UNIQUE NOT NULL,
+    setting_value TEXT,
+    description TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_attendance_created ON attendance(created_at DESC);
+
+-- Covering indexes for the dashboard and report aggregates; they
+-- also serve lookups on their leading column, which replaces the
+-- older single-column date and room indexes
+CREATE INDEX IF NOT EXISTS idx_attendance_date_status ON attendance(scan_date, status);
+CREATE INDEX IF NOT EXISTS idx_attendance_date_student ON attendance(scan_date, student_id);
+CREATE INDEX IF NOT EXISTS idx_attendance_room_date ON attendance(room_id, scan_date);
+DROP INDEX IF EXISTS idx_attendance_date;
+DROP INDEX IF EXISTS idx_attendance_room;
+
+-- Per-student lookups (daily scan limit, history) also filter on
+-- the date; this supersedes the single-column student index
+CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance(student_id, scan_date, room_id);
+DROP INDEX IF EXISTS idx_attendance_student;
+
+-- Schedule lookups by room and weekday on every scan, and by professor
+CREATE INDEX IF NOT EXISTS idx_room_assignments_room_day ON room_assignments(room_id, day_of_week, start_time);
+CREATE INDEX IF NOT EXISTS idx_room_assignments_professor ON room_assignments(professor_id);
+
+CREATE INDEX IF NOT EXISTS idx_students_qr ON students(qr_code);
+CREATE INDEX IF NOT EXISTS idx_students_id ON students(student_id);
+
+-- Active students and rooms in listing order; also serve the per-department
+-- and per-building lists and their DISTINCT filter options
+CREATE INDEX IF NOT EXISTS idx_students_active ON students(department, year_level, section, last_name, first_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_rooms_active ON rooms(building, floor, room_name) WHERE is_active = 1;
+
+-- User listing order, for active users and for all users
+CREATE INDEX IF NOT EXISTS idx_users_listing_active ON users(user_type, full_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_users_listing ON users(user_type, full_name);
+"""
+
+def _close_at_exit(manager_ref):
+    """Close a DatabaseManager's connections at interpreter exit if it still exists."""
+    manager = manager_ref()
+    if manager is not None:
+        manager.close_all_connections()
 
 class DatabaseManager:
     """
@@ -34,51 +216,180 @@ class DatabaseManager:
     and data manipulation with proper error handling and transaction support.
     """
     
-    def __init__(self, db_path):
+    # Database directories already ensured by this process
+    _created_dirs = set()
+    
+    def __init__(self, db_path, pool_size=10):
         """
         Initialize the database manager with the specified database path.
         
         Args:
             db_path (str): Path to the SQLite database file
+            pool_size (int): Maximum number of idle read connections kept for reuse
         """
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         self._local = threading.local()
+        self._pool = queue.Queue(maxsize=pool_size)
         
-        # Ensure database directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # SQLite allows a single writer at a time, so all writes in this
+        # process share one connection and queue on a lock instead of
+        # contending for the database lock
+        self._writer = None
+        self._write_lock = threading.RLock()
+        
+        # System settings, written through on update; the TTL bounds how long
+        # other worker processes can serve a value changed elsewhere
+        self.settings_cache_ttl = 60  # Seconds
+        self._settings_cache = {}  # key -> (cached_at, value or None)
+        self._settings_lock = threading.Lock()
+        
+        # Set when periodic WAL checkpoints are enabled
+        self._checkpoint_stop = None
+        
+        # Ensure database directory exists; a bare filename lives in the
+        # working directory, and each directory is only checked once
+        db_dir = os.path.dirname(db_path)
+        if db_dir and db_dir not in DatabaseManager._created_dirs:
+            os.makedirs(db_dir, exist_ok=True)
+            DatabaseManager._created_dirs.add(db_dir)
         
         # Initialize database schema if it doesn't exist
         self.initialize_database()
+        
+        # Close connections while the interpreter is still fully alive; the
+        # weak reference lets short-lived managers be collected as before
+        atexit.register(_close_at_exit, weakref.ref(self))
+    
+    def _create_connection(self, readonly=False):
+        """
+        Open a new SQLite connection configured for concurrent access.
+        
+        Args:
+            readonly (bool): Open the database in read-only mode
+        
+        Returns:
+            sqlite3.Connection: Database connection object
+        """
+        if readonly:
+            database, uri = Path(self.db_path).resolve().as_uri() + '?mode=ro', True
+        else:
+            database, uri = self.db_path, False
+        
+        # Autocommit mode: multi-statement writes open their own
+        # BEGIN IMMEDIATE via transaction(), so the write lock is taken up front.
+        # Pooled connections are handed from thread to thread (one at a time)
+        # and the writer is shared under a lock, hence check_same_thread=False.
+        conn = sqlite3.connect(
+            database,
+            check_same_thread=False,
+            timeout=30.0,
+            cached_statements=512,
+            isolation_level=None,
+            uri=uri
+        )
+        conn.row_factory = sqlite3.Row
+        # Per-connection settings, applied once when the connection is opened;
+        # WAL itself is persisted in the database file by initialize_database.
+        # The busy timeout comes from timeout above.
+        conn.executescript("""
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -64000;
+            PRAGMA mmap_size = 268435456;
+        """)
+        if not readonly:
+            # Only affect writes, so read-only connections skip them
+            conn.executescript("""
+                PRAGMA foreign_keys = ON;
+                PRAGMA synchronous = NORMAL;
+                PRAGMA journal_size_limit = 67108864;
+            """)
+        return conn
+    
+    def acquire_connection(self):
+        """
+        Check a read connection out of the pool and bind it to the current
+        thread, so every query issued by this thread reuses it until it is
+        released.
+        
+        Returns:
+            sqlite3.Connection: Database connection object
+        """
+        # Hand any connection lazily opened by this thread back to the pool
+        previous = getattr(self._local, 'connection', None)
+        if previous is not None:
+            self.release_connection(previous)
+        
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._create_connection(readonly=True)
+        
+        self._local.connection = conn
+        return conn
+    
+    def release_connection(self, conn):
+        """
+        Unbind a connection from the current thread and return it to the pool.
+        
+        Args:
+            conn (sqlite3.Connection): Connection obtained from acquire_connection
+        """
+        if getattr(self._local, 'connection', None) is conn:
+            del self._local.connection
+        
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        except Exception as e:
+            self.logger.error(f"Failed to release connection: {str(e)}")
+            conn.close()
     
     @contextmanager
-    def get_connection(self):
+    def get_connection(self, readonly=False):
         """
         Context manager for database connections with automatic cleanup.
-        Provides thread-local connections for thread safety.
+        
+        Reads use the read-only connection bound to the current thread,
+        opening one if needed, so concurrent requests read in parallel under
+        WAL. Writes hold the shared writer connection for the duration of the
+        block.
+        
+        Args:
+            readonly (bool): Whether the block only reads
         
         Yields:
             sqlite3.Connection: Database connection object
         """
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False,
-                timeout=30.0
-            )
-            self._local.connection.row_factory = sqlite3.Row
-            # Enable foreign key constraints
-            self._local.connection.execute("PRAGMA foreign_keys = ON")
+        if readonly:
+            if not hasattr(self._local, 'connection'):
+                self._local.connection = self._create_connection(readonly=True)
+            conn = self._local.connection
+            
+            try:
+                yield conn
+            except Exception as e:
+                self.logger.error(f"Database operation failed: {str(e)}")
+                raise
+            finally:
+                # Connection remains open for reuse within the thread
+                pass
+            return
         
-        try:
-            yield self._local.connection
-        except Exception as e:
-            self._local.connection.rollback()
-            self.logger.error(f"Database operation failed: {str(e)}")
-            raise
-        finally:
-            # Connection remains open for reuse within the thread
-            pass
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._create_connection()
+            
+            try:
+                yield self._writer
+            except Exception as e:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+                self.logger.error(f"Database operation failed: {str(e)}")
+                raise
     
     def initialize_database(self):
         """
@@ -86,155 +397,40 @@ class DatabaseManager:
         This method is idempotent and can be called multiple times safely.
         """
         try:
+            # WAL lets dashboard readers proceed while a scan is being written.
+            # The mode is stored in the database file, so set it once here
+            # rather than on every new connection.
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Create users table (professors, admins, staff)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username VARCHAR(50) UNIQUE NOT NULL,
-                        password_hash VARCHAR(255) NOT NULL,
-                        full_name VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) UNIQUE,
-                        user_type VARCHAR(20) DEFAULT 'user',
-                        department VARCHAR(100),
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create students table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS students (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        student_id VARCHAR(20) UNIQUE NOT NULL,
-                        first_name VARCHAR(50) NOT NULL,
-                        last_name VARCHAR(50) NOT NULL,
-                        middle_name VARCHAR(50),
-                        department VARCHAR(100) NOT NULL,
-                        year_level INTEGER NOT NULL,
-                        section VARCHAR(10) NOT NULL,
-                        email VARCHAR(100) UNIQUE,
-                        phone VARCHAR(20),
-                        qr_code VARCHAR(255) UNIQUE NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create rooms table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS rooms (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        room_code VARCHAR(20) UNIQUE NOT NULL,
-                        room_name VARCHAR(100) NOT NULL,
-                        building VARCHAR(100),
-                        floor INTEGER,
-                        capacity INTEGER DEFAULT 0,
-                        room_type VARCHAR(50) DEFAULT 'classroom',
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create subjects table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS subjects (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        subject_code VARCHAR(20) UNIQUE NOT NULL,
-                        subject_name VARCHAR(100) NOT NULL,
-                        description TEXT,
-                        units INTEGER DEFAULT 3,
-                        professor_id INTEGER,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (professor_id) REFERENCES users(id)
-                    )
-                """)
-                
-                # Create attendance table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS attendance (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        student_id INTEGER NOT NULL,
-                        room_id INTEGER NOT NULL,
-                        subject_id INTEGER,
-                        scan_date DATE NOT NULL,
-                        scan_time TIME NOT NULL,
-                        status VARCHAR(20) DEFAULT 'present',
-                        notes TEXT,
-                        scanned_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (student_id) REFERENCES students(id),
-                        FOREIGN KEY (room_id) REFERENCES rooms(id),
-                        FOREIGN KEY (subject_id) REFERENCES subjects(id),
-                        FOREIGN KEY (scanned_by) REFERENCES users(id),
-                        UNIQUE(student_id, room_id, scan_date)
-                    )
-                """)
-                
-                # Create room_assignments table (which professor is assigned to which room)
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS room_assignments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        professor_id INTEGER NOT NULL,
-                        room_id INTEGER NOT NULL,
-                        subject_id INTEGER,
-                        day_of_week INTEGER NOT NULL,
-                        start_time TIME NOT NULL,
-                        end_time TIME NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (professor_id) REFERENCES users(id),
-                        FOREIGN KEY (room_id) REFERENCES rooms(id),
-                        FOREIGN KEY (subject_id) REFERENCES subjects(id)
-                    )
-                """)
-                
-                # Create notifications table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS notifications (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER,
-                        title VARCHAR(100) NOT NULL,
-                        message TEXT NOT NULL,
-                        type VARCHAR(50) DEFAULT 'info',
-                        is_read BOOLEAN DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users(id)
-                    )
-                """)
-                
-                # Create system_settings table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS system_settings (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        setting_key VARCHAR(100) UNIQUE NOT NULL,
-                        setting_value TEXT,
-                        description TEXT,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create indexes for better performance
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(scan_date)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student ON attendance(student_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_room ON attendance(room_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_qr ON students(qr_code)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_id ON students(student_id)")
+                conn.execute("PRAGMA journal_mode = WAL")
                 
-                conn.commit()
+                # All tables and indexes in one call. Before Python 3.12
+                # executescript commits any open transaction first, so the
+                # script carries its own BEGIN/COMMIT.
+                conn.executescript("BEGIN IMMEDIATE;\n" + _SCHEMA_SQL + "\nCOMMIT;")
+            
+            with self.transaction() as conn:
+                cursor = conn.cursor()
                 
                 # Insert default data if tables are empty
                 self._insert_default_data(cursor)
-                conn.commit()
                 
                 self.logger.info("Database initialized successfully")
+            
+            # Gather planner statistics on first start; afterwards let SQLite
+            # decide whether they are stale enough to refresh
+            with self.get_connection() as conn:
+                has_stats = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+                ).fetchone()
+                conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+            
+            # Warm the settings cache so early lookups never touch SQLite
+            now = monotonic()
+            rows = self.execute_query("SELECT setting_key, setting_value FROM system_settings",
+                                      as_dict=False)
+            with self._settings_lock:
+                for row in rows:
+                    self._settings_cache[row['setting_key']] = (now, row['setting_value'])
         
         except Exception as e:
             self.logger.error(f"Failed to initialize database: {str(e)}")
@@ -243,31 +439,33 @@ class DatabaseManager:
     def _insert_default_data(self, cursor):
         """
         Insert default system data including admin user, sample rooms, and settings.
+        Runs on the cursor of initialize_database's transaction, so all seed
+        rows are committed together.
         
         Args:
             cursor: Database cursor object
         """
         try:
             # Check if admin user exists
-            cursor.execute("SELECT COUNT(*) FROM users WHERE user_type = 'admin'")
-            if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT 1 FROM users WHERE user_type = 'admin' LIMIT 1")
+            if cursor.fetchone() is None:
                 # Insert default admin user
-                admin_password = generate_password_hash('admin123')
+                admin_password = hash_password('admin123')
                 cursor.execute("""
                     INSERT INTO users (username, password_hash, full_name, email, user_type, department)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, ('admin', admin_password, 'System Administrator', 'admin@school.edu', 'admin', 'IT Department'))
                 
                 # Insert sample professor
-                prof_password = generate_password_hash('prof123')
+                prof_password = hash_password('prof123')
                 cursor.execute("""
                     INSERT INTO users (username, password_hash, full_name, email, user_type, department)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, ('prof1', prof_password, 'Dr. John Smith', 'john.smith@school.edu', 'professor', 'Computer Science'))
             
             # Check if rooms exist
-            cursor.execute("SELECT COUNT(*) FROM rooms")
-            if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT 1 FROM rooms LIMIT 1")
+            if cursor.fetchone() is None:
                 # Insert sample rooms
                 sample_rooms = [
                     ('R101', 'Room 101 - Lecture Hall A', 'Main Building', 1, 50, 'lecture'),
@@ -282,27 +480,25 @@ class DatabaseManager:
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, sample_rooms)
             
-            # Check if system settings exist
-            cursor.execute("SELECT COUNT(*) FROM system_settings")
-            if cursor.fetchone()[0] == 0:
-                # Insert default system settings
-                default_settings = [
-                    ('system_name', 'QR Code Attendance System', 'Name of the attendance system'),
-                    ('max_daily_scans', '5', 'Maximum number of scans per student per day'),
-                    ('late_threshold_minutes', '15', 'Minutes after class start to mark as late'),
-                    ('session_timeout', '60', 'Session timeout in minutes'),
-                    ('notification_enabled', '1', 'Enable real-time notifications'),
-                    ('export_formats', 'excel,csv,pdf', 'Supported export formats')
-                ]
-                
-                cursor.executemany("""
-                    INSERT INTO system_settings (setting_key, setting_value, description)
-                    VALUES (?, ?, ?)
-                """, default_settings)
+            # Insert default system settings; the UNIQUE setting_key leaves
+            # existing (possibly customised) values alone and adds new defaults
+            default_settings = [
+                ('system_name', 'QR Code Attendance System', 'Name of the attendance system'),
+                ('max_daily_scans', '5', 'Maximum number of scans per student per day'),
+                ('late_threshold_minutes', '15', 'Minutes after class start to mark as late'),
+                ('session_timeout', '60', 'Session timeout in minutes'),
+                ('notification_enabled', '1', 'Enable real-time notifications'),
+                ('export_formats', 'excel,csv,pdf', 'Supported export formats')
+            ]
+            
+            cursor.executemany("""
+                INSERT OR IGNORE INTO system_settings (setting_key, setting_value, description)
+                VALUES (?, ?, ?)
+            """, default_settings)
             
             # Insert sample students if none exist
-            cursor.execute("SELECT COUNT(*) FROM students")
-            if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT 1 FROM students LIMIT 1")
+            if cursor.fetchone() is None:
                 sample_students = [
                     ('2024001', 'Juan', 'Dela Cruz', 'Miguel', 'BSIT', 3, 'A', 'juan.delacruz@student.edu', '09123456789', 'QR2024001'),
                     ('2024002', 'Maria', 'Santos', 'Garcia', 'BSIT', 3, 'A', 'maria.santos@student.edu', '09123456790', 'QR2024002'),
@@ -323,7 +519,7 @@ class DatabaseManager:
             self.logger.error(f"Failed to insert default data: {str(e)}")
             raise
     
-    def execute_query(self, query, params=None, fetch_all=True):
+    def execute_query(self, query, params=None, fetch_all=True, as_dict=True):
         """
         Execute a SELECT query and return results.
         
@@ -331,12 +527,15 @@ class DatabaseManager:
             query (str): SQL query string
             params (tuple): Query parameters
             fetch_all (bool): Whether to fetch all results or just one
+            as_dict (bool): Copy rows into dicts; pass False to get the
+                sqlite3.Row objects, which support row['column'] without a
+                per-row copy when the rows are only read internally
         
         Returns:
             list or dict: Query results
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
                 
                 if params:
@@ -346,64 +545,198 @@ class DatabaseManager:
                 
                 if fetch_all:
                     results = cursor.fetchall()
-                    return [dict(row) for row in results]
+                    return [dict(row) for row in results] if as_dict else results
                 else:
                     result = cursor.fetchone()
-                    return dict(result) if result else None
+                    return dict(result) if result and as_dict else result
         
         except Exception as e:
             self.logger.error(f"Query execution failed: {str(e)}")
             raise
-    
-    def execute_update(self, query, params=None):
+
+    def execute_query_iter(self, query, params=None, batch_size=1000):
         """
-        Execute an INSERT, UPDATE, or DELETE query.
-        
+        Execute a SELECT query and yield results in batches.
+
+        Only batch_size rows are held in memory at a time. The pooled
+        connection stays checked out until the iterator is exhausted or
+        closed, so consume it promptly.
+
         Args:
             query (str): SQL query string
             params (tuple): Query parameters
-        
+            batch_size (int): Rows fetched per round
+
+        Yields:
+            dict: One result row
+        """
+        try:
+            with self.get_connection(readonly=True) as conn:
+                cursor = conn.cursor()
+                cursor.arraysize = batch_size
+
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {str(e)}")
+            raise
+
+    def execute_query_row(self, query, params=None):
+        """
+        Execute a SELECT query and return the first row as a plain tuple.
+
+        Values come back in SELECT-list order, so callers on hot paths can
+        unpack them positionally instead of building a dict keyed by column.
+
+        Args:
+            query (str): SQL query string
+            params (tuple): Query parameters
+
         Returns:
-            int: Number of affected rows or last inserted row ID
+            tuple: First result row, or None if there is none
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(readonly=True) as conn:
                 cursor = conn.cursor()
-                
+                cursor.row_factory = None
+
                 if params:
                     cursor.execute(query, params)
                 else:
                     cursor.execute(query)
-                
-                conn.commit()
-                
-                # Return last inserted row ID for INSERT statements
-                if query.strip().upper().startswith('INSERT'):
-                    return cursor.lastrowid
+
+                return cursor.fetchone()
+
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {str(e)}")
+            raise
+
+    def execute_query_columns(self, query, params=None):
+        """
+        Execute a SELECT query and return results column-wise.
+
+        Rows are fetched as plain tuples and transposed into one list per
+        column, avoiding a dict allocation per row for large JSON payloads.
+
+        Args:
+            query (str): SQL query string
+            params (tuple): Query parameters
+
+        Returns:
+            dict: Mapping of column name to list of values
+        """
+        try:
+            with self.get_connection(readonly=True) as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+
+                if params:
+                    cursor.execute(query, params)
                 else:
-                    return cursor.rowcount
+                    cursor.execute(query)
+
+                rows = cursor.fetchall()
+                names = [column[0] for column in cursor.description]
+                columns = zip(*rows) if rows else ([] for _ in names)
+                return {name: list(values) for name, values in zip(names, columns)}
+
+        except Exception as e:
+            self.logger.error(f"Query execution failed: {str(e)}")
+            raise
+
+    def execute_insert(self, query, params=None):
+        """
+        Execute an INSERT query.
+        
+        Args:
+            query (str): SQL query string
+            params (tuple): Query parameters
+        
+        Returns:
+            int: Last inserted row ID
+        """
+        try:
+            return self._execute_write(query, params).lastrowid
+        
+        except Exception as e:
+            self.logger.error(f"Insert execution failed: {str(e)}")
+            raise
+    
+    def execute_modify(self, query, params=None):
+        """
+        Execute an UPDATE or DELETE query.
+        
+        Args:
+            query (str): SQL query string
+            params (tuple): Query parameters
+        
+        Returns:
+            int: Number of affected rows
+        """
+        try:
+            return self._execute_write(query, params).rowcount
         
         except Exception as e:
             self.logger.error(f"Update execution failed: {str(e)}")
             raise
     
-    def execute_many(self, query, params_list):
+    def _execute_write(self, query, params):
+        """
+        Run a single write statement on the writer connection.
+        
+        Args:
+            query (str): SQL query string
+            params (tuple): Query parameters
+        
+        Returns:
+            sqlite3.Cursor: Cursor of the executed statement
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            conn.commit()
+            return cursor
+    
+    def execute_many(self, query, params_list, batch_size=1000):
         """
         Execute a query multiple times with different parameters.
         
+        Rows are written in transactions of up to batch_size rows, so a very
+        large batch cannot grow the WAL without bound before a checkpoint.
+        Earlier batches stay committed if a later one fails.
+        
         Args:
             query (str): SQL query string
-            params_list (list): List of parameter tuples
+            params_list (iterable): Parameter tuples, any iterable
+            batch_size (int): Maximum rows written per transaction
         
         Returns:
             int: Number of affected rows
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.executemany(query, params_list)
-                conn.commit()
-                return cursor.rowcount
+            affected = 0
+            params_iter = iter(params_list)
+            while True:
+                batch = list(islice(params_iter, batch_size))
+                if not batch:
+                    return affected
+                with self.transaction() as conn:
+                    affected += conn.executemany(query, batch).rowcount
         
         except Exception as e:
             self.logger.error(f"Batch execution failed: {str(e)}")
@@ -419,6 +752,7 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             try:
+                conn.execute("BEGIN IMMEDIATE")
                 yield conn
                 conn.commit()
             except Exception as e:
@@ -426,6 +760,34 @@ class DatabaseManager:
                 self.logger.error(f"Transaction rolled back: {str(e)}")
                 raise
     
+    def get_admin_overview(self, date=None):
+        """
+        Get the admin dashboard headline counts in a single query.
+
+        Args:
+            date (str): Date to summarise (YYYY-MM-DD), defaults to today
+
+        Returns:
+            dict: Entity totals and attendance counts for the date
+        """
+        date = date or today_str()
+
+        return self.execute_query(
+            """SELECT (SELECT COUNT(*) FROM students WHERE is_active = 1) as total_students,
+                      (SELECT COUNT(*) FROM users
+                       WHERE user_type = 'professor' AND is_active = 1) as total_professors,
+                      (SELECT COUNT(*) FROM rooms WHERE is_active = 1) as total_rooms,
+                      COUNT(*) as today_scans,
+                      COUNT(DISTINCT student_id) as active_sessions,
+                      COALESCE(SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END), 0) as present_today,
+                      COALESCE(SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END), 0) as late_today,
+                      COUNT(DISTINCT room_id) as active_rooms
+               FROM attendance
+               WHERE scan_date = ?""",
+            (date,),
+            fetch_all=False
+        )
+
     def get_system_setting(self, key, default_value=None):
         """
         Get a system setting value by key.
@@ -437,13 +799,16 @@ class DatabaseManager:
         Returns:
             str: Setting value
         """
+        cached = self._settings_cache.get(key)
+        if cached and monotonic() - cached[0] < self.settings_cache_ttl:
+            return default_value if cached[1] is None else cached[1]
+        
         try:
-            result = self.execute_query(
-                "SELECT setting_value FROM system_settings WHERE setting_key = ?",
-                (key,),
-                fetch_all=False
-            )
-            return result['setting_value'] if result else default_value
+            result = self.execute_query_row(_SQL_GET_SETTING, (key,))
+            value = result[0] if result else None
+            with self._settings_lock:
+                self._settings_cache[key] = (monotonic(), value)
+            return default_value if value is None else value
         
         except Exception as e:
             self.logger.error(f"Failed to get system setting {key}: {str(e)}")
@@ -462,43 +827,103 @@ class DatabaseManager:
             bool: Success status
         """
         try:
-            with self.transaction() as conn:
-                cursor = conn.cursor()
-                
-                # Check if setting exists
-                cursor.execute("SELECT id FROM system_settings WHERE setting_key = ?", (key,))
-                exists = cursor.fetchone()
-                
-                if exists:
-                    # Update existing setting
-                    cursor.execute("""
-                        UPDATE system_settings 
-                        SET setting_value = ?, description = COALESCE(?, description), 
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE setting_key = ?
-                    """, (value, description, key))
-                else:
-                    # Insert new setting
-                    cursor.execute("""
-                        INSERT INTO system_settings (setting_key, setting_value, description)
-                        VALUES (?, ?, ?)
-                    """, (key, value, description))
-                
-                return True
+            # Single-statement upsert on the UNIQUE setting_key (SQLite 3.24+)
+            self.execute_modify("""
+                INSERT INTO system_settings (setting_key, setting_value, description)
+                VALUES (?, ?, ?)
+                ON CONFLICT(setting_key) DO UPDATE SET
+                    setting_value = excluded.setting_value,
+                    description = COALESCE(excluded.description, description),
+                    updated_at = CURRENT_TIMESTAMP
+            """, (key, value, description))
+            
+            # Write through once committed; the TEXT column stores values as strings
+            with self._settings_lock:
+                self._settings_cache[key] = (monotonic(), None if value is None else str(value))
+            return True
         
         except Exception as e:
             self.logger.error(f"Failed to update system setting {key}: {str(e)}")
             return False
     
+    def enable_wal_checkpoints(self, interval=60):
+        """
+        Checkpoint the WAL from a background thread.
+        
+        Runs a PASSIVE checkpoint every interval seconds, so the log is reset
+        and reused instead of growing during long bursts of scans. PASSIVE
+        never waits on readers, so it cannot hold up writes; the writer's
+        journal_size_limit trims the file once the log has been reset.
+        
+        Args:
+            interval (float): Seconds between checkpoints
+        """
+        if self._checkpoint_stop is not None:
+            return
+        
+        self._checkpoint_stop = threading.Event()
+        threading.Thread(
+            target=self._run_wal_checkpoints,
+            args=(interval,),
+            name='wal-checkpoint',
+            daemon=True
+        ).start()
+        
+        self.logger.info("Periodic WAL checkpoints enabled")
+    
+    def _run_wal_checkpoints(self, interval):
+        """Background thread that checkpoints the WAL until stopped."""
+        while not self._checkpoint_stop.wait(interval):
+            self.checkpoint_wal()
+    
+    def checkpoint_wal(self, mode='PASSIVE'):
+        """
+        Copy the WAL into the database file.
+        
+        Runs on the writer connection, so it waits for in-process writes
+        instead of competing with them for the database lock. TRUNCATE also
+        waits (up to the busy timeout) for readers to finish, holding up
+        every write meanwhile, so it is only used at shutdown.
+        
+        Args:
+            mode (str): PASSIVE, FULL, RESTART or TRUNCATE
+        
+        Returns:
+            bool: True if the whole log was checkpointed
+        """
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        
+        try:
+            with self.get_connection() as conn:
+                busy, _, _ = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            return not busy
+        
+        except Exception as e:
+            self.logger.error(f"WAL checkpoint failed: {str(e)}")
+            return False
+    
     def close_all_connections(self):
         """Close all database connections for cleanup."""
         try:
+            if self._checkpoint_stop is not None:
+                self._checkpoint_stop.set()
+            
             if hasattr(self._local, 'connection'):
                 self._local.connection.close()
                 del self._local.connection
+            
+            with self._write_lock:
+                if self._writer is not None:
+                    # Leave a clean database file behind on shutdown
+                    self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    self._writer.close()
+                    self._writer = None
+            
+            while True:
+                try:
+                    self._pool.get_nowait().close()
+                except queue.Empty:
+                    break
         except Exception as e:
             self.logger.error(f"Error closing connections: {str(e)}")
-    
-    def __del__(self):
-        """Cleanup when object is destroyed."""
-        self.close_all_connections()
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Date Utilities Module - Flask QR Code Attendance System
+Author: GitHub Copilot
+Date: September 2025
+
+Shared date helpers for the attendance system. "Today" is read on nearly
+every dashboard and report request, so the formatted date string is cached
+and refreshed at most once per second. Notification timestamps are cached
+per millisecond, since bursts of scans create many within the same one.
+"""
+
+from datetime import datetime
+from time import monotonic, time_ns
+
+# [formatted date, monotonic time it was computed]
+_TODAY = [None, 0.0]
+
+# (epoch millisecond, ISO timestamp for it), replaced as a whole so readers
+# never see one half updated
+_NOW_ISO = (-1, '')
+
+def today_str() -> str:
+    """
+    Get today's date as YYYY-MM-DD, recomputed at most once per second.
+
+    Returns:
+        str: Today's date string
+    """
+    now = monotonic()
+    if _TODAY[0] is None or now - _TODAY[1] > 1.0:
+        _TODAY[0] = datetime.now().strftime('%Y-%m-%d')
+        _TODAY[1] = now
+    return _TODAY[0]
+
+def now_iso() -> str:
+    """
+    Get the current local time in ISO 8601 format, at millisecond precision.
+
+    Returns:
+        str: Current timestamp string
+    """
+    global _NOW_ISO
+    ms = time_ns() // 1_000_000
+    if _NOW_ISO[0] != ms:
+        _NOW_ISO = (ms, datetime.fromtimestamp(ms / 1000).isoformat())
+    return _NOW_ISO[1]
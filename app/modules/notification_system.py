@@ -19,6 +19,7 @@ Features:
 """
 
 import smtplib
+import socket
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -28,12 +29,30 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
 import threading
-from queue import Queue
+from collections import OrderedDict
+from itertools import count, islice
+from time import monotonic_ns, sleep
+from queue import Empty, Full, Queue, SimpleQueue
 import asyncio
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from jinja2 import Template
 import ssl
 import os
+import zlib
+
+from app.modules.date_utils import now_iso, today_str
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode()
 
 @dataclass
 class NotificationData:
@@ -48,6 +67,29 @@ class NotificationData:
     created_at: str
     is_read: bool = False
     is_sent: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the notification as a dictionary.
+        
+        Unlike dataclasses.asdict this does not deep-copy, so the nested data
+        dict is shared with the notification.
+        
+        Returns:
+            Dict[str, Any]: Notification fields
+        """
+        return {
+            'id': self.id,
+            'type': self.type,
+            'title': self.title,
+            'message': self.message,
+            'severity': self.severity,
+            'recipient': self.recipient,
+            'data': self.data,
+            'created_at': self.created_at,
+            'is_read': self.is_read,
+            'is_sent': self.is_sent
+        }
 
 class NotificationSystem:
     """
@@ -77,11 +119,23 @@ class NotificationSystem:
             'SUCCESS': 'success'
         }
         
-        # Notification queue for background processing
-        self.notification_queue = Queue()
+        # Notification queue for background processing. SimpleQueue has no
+        # task tracking or condition variables, so put() is a cheap C call on
+        # the request path.
+        self.notification_queue = SimpleQueue()
+        self.store_batch_size = 256
         
-        # WebSocket connections for real-time updates
-        self.websocket_connections = set()
+        # Stored notifications are appended to one NDJSON file per day,
+        # written only by the processor thread
+        self.notifications_dir = 'database/notifications'
+        self._notifications_dir_ready = False
+        self._store_file = None
+        self._store_date = None
+        
+        # WebSocket connections for real-time updates, mapped to the outbound
+        # queue drained by each connection's sender thread
+        self.websocket_connections = {}
+        self.websocket_queue_size = 1000
         
         # Email configuration
         self.email_config = {
@@ -92,13 +146,20 @@ class NotificationSystem:
             'use_tls': True
         }
         
-        # Notification templates
+        # SMTP session reused across emails, shared by the processor thread
+        # and request threads
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+        
+        # Notification templates, compiled once rather than on every email
         self.templates = {
-            'attendance_scan': self._get_attendance_scan_template(),
-            'late_arrival': self._get_late_arrival_template(),
-            'duplicate_scan': self._get_duplicate_scan_template(),
-            'system_alert': self._get_system_alert_template(),
-            'report_ready': self._get_report_ready_template()
+            name: Template(source) for name, source in {
+                'attendance_scan': self._get_attendance_scan_template(),
+                'late_arrival': self._get_late_arrival_template(),
+                'duplicate_scan': self._get_duplicate_scan_template(),
+                'system_alert': self._get_system_alert_template(),
+                'report_ready': self._get_report_ready_template()
+            }.items()
         }
         
         # Start background notification processor
@@ -108,17 +169,25 @@ class NotificationSystem:
         )
         self.notification_processor.start()
         
-        # Active notifications cache
-        self.active_notifications = {}
+        # Active notifications cache, oldest first and bounded
+        self.active_notifications = OrderedDict()
+        self.active_notifications_max = 1000
+        self._active_lock = threading.Lock()
+        
+        # Suffix keeping notification IDs unique within a clock tick
+        self._id_counter = count()
         
         self.logger.info("Notification system initialized")
     
-    def send_attendance_notification(self, attendance_data: Dict[str, Any]) -> bool:
+    def send_attendance_notification(self, attendance_data: Dict[str, Any],
+                                     process: bool = True, broadcast: bool = True) -> bool:
         """
         Send real-time attendance notification.
         
         Args:
             attendance_data (Dict[str, Any]): Attendance scan data
+            process (bool): Queue for storage and background processing
+            broadcast (bool): Push to this process's WebSocket clients
         
         Returns:
             bool: Success status
@@ -131,23 +200,25 @@ class NotificationSystem:
             
             # Create notification
             notification = NotificationData(
-                id=f"attendance_{datetime.now().timestamp()}",
+                id=self._new_notification_id('attendance'),
                 type=notification_type,
                 title=f"Attendance Recorded - {attendance_data['student_name']}",
                 message=self._format_attendance_message(attendance_data),
                 severity=severity,
                 recipient=None,  # Broadcast to all connected clients
                 data=attendance_data,
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso(),
                 is_read=False,
                 is_sent=False
             )
             
             # Queue for processing
-            self.notification_queue.put(notification)
+            if process:
+                self.notification_queue.put(notification)
             
             # Send immediate real-time update
-            self._broadcast_realtime_notification(notification)
+            if broadcast:
+                self._broadcast_realtime_notification(notification)
             
             self.logger.info(f"Attendance notification queued for {attendance_data['student_name']}")
             return True
@@ -169,14 +240,14 @@ class NotificationSystem:
         """
         try:
             notification = NotificationData(
-                id=f"duplicate_{datetime.now().timestamp()}",
+                id=self._new_notification_id('duplicate'),
                 type=self.NOTIFICATION_TYPES['DUPLICATE_SCAN'],
                 title="Duplicate Scan Alert",
                 message=f"Duplicate scan attempt detected for {student_data.get('name', 'Unknown')} in {room_data.get('name', 'Unknown Room')}",
                 severity=self.SEVERITY_LEVELS['WARNING'],
                 recipient=None,
                 data={'student': student_data, 'room': room_data},
-                created_at=datetime.now().isoformat()
+                created_at=now_iso()
             )
             
             self.notification_queue.put(notification)
@@ -205,14 +276,14 @@ class NotificationSystem:
         """
         try:
             notification = NotificationData(
-                id=f"system_{datetime.now().timestamp()}",
+                id=self._new_notification_id('system'),
                 type=self.NOTIFICATION_TYPES['SYSTEM_ALERT'],
                 title=title,
                 message=message,
                 severity=severity,
                 recipient=recipient,
                 data=additional_data or {},
-                created_at=datetime.now().isoformat()
+                created_at=now_iso()
             )
             
             self.notification_queue.put(notification)
@@ -241,14 +312,14 @@ class NotificationSystem:
         """
         try:
             notification = NotificationData(
-                id=f"report_{datetime.now().timestamp()}",
+                id=self._new_notification_id('report'),
                 type=self.NOTIFICATION_TYPES['REPORT_READY'],
                 title="Report Generated Successfully",
                 message=f"Report '{report_info.get('filename', 'Unknown')}' is ready for download",
                 severity=self.SEVERITY_LEVELS['SUCCESS'],
                 recipient=recipient_email,
                 data=report_info,
-                created_at=datetime.now().isoformat()
+                created_at=now_iso()
             )
             
             self.notification_queue.put(notification)
@@ -263,6 +334,18 @@ class NotificationSystem:
             self.logger.error(f"Failed to send report ready notification: {str(e)}")
             return False
     
+    def _new_notification_id(self, prefix: str) -> str:
+        """
+        Generate a unique notification ID.
+        
+        Args:
+            prefix (str): Notification kind, e.g. 'attendance'
+        
+        Returns:
+            str: Notification ID
+        """
+        return f"{prefix}_{monotonic_ns()}_{next(self._id_counter)}"
+    
     def _format_attendance_message(self, attendance_data: Dict[str, Any]) -> str:
         """
         Format attendance notification message.
@@ -316,15 +399,21 @@ class NotificationSystem:
         """
         try:
             # Convert notification to dictionary
-            notification_dict = asdict(notification)
-            notification_json = json.dumps(notification_dict)
+            notification_dict = notification.to_dict()
+            notification_json = _json_bytes(notification_dict)
             
             # Store in active notifications
-            self.active_notifications[notification.id] = notification_dict
+            with self._active_lock:
+                self.active_notifications[notification.id] = notification_dict
+                if len(self.active_notifications) > self.active_notifications_max:
+                    self.active_notifications.popitem(last=False)
             
-            # In a real implementation, you would broadcast to WebSocket clients here
-            # For now, we'll log the notification
             self.logger.info(f"Broadcasting notification: {notification.title}")
+            # Compress once and send the same bytes to every client, rather
+            # than having each socket deflate its own copy; skipped when
+            # nobody is connected
+            if self.websocket_connections:
+                self._send_to_websockets(zlib.compress(notification_json, 6))
             
             # Simulate real-time display (in production, this would use WebSockets)
             self._display_popup_notification(notification_dict)
@@ -332,6 +421,51 @@ class NotificationSystem:
         except Exception as e:
             self.logger.error(f"Failed to broadcast real-time notification: {str(e)}")
     
+    def _send_to_websockets(self, payload: bytes) -> None:
+        """
+        Queue a serialized notification for every connected WebSocket client.
+        
+        Each client's sender thread performs the actual send, so a broadcast
+        is one queue put per client. Clients whose queue is full are too slow
+        to keep up and are dropped.
+        
+        Args:
+            payload (bytes): zlib-compressed JSON notification
+        """
+        for connection, outbox in list(self.websocket_connections.items()):
+            try:
+                outbox.put_nowait(payload)
+            except Full:
+                self.logger.warning("Dropping WebSocket client with a full send queue")
+                self.remove_websocket_connection(connection)
+    
+    def _websocket_sender(self, connection, outbox: Queue) -> None:
+        """
+        Background thread sending queued payloads to one WebSocket client.
+        
+        Exits once the connection has been removed, which for a client dropped
+        for a full queue is noticed on the next payload rather than through
+        the sentinel, and closes the connection on the way out.
+        """
+        while True:
+            payload = outbox.get()
+            
+            if payload is None or self.websocket_connections.get(connection) is not outbox:
+                break
+            
+            try:
+                connection.send(payload)
+            except Exception:
+                self.remove_websocket_connection(connection)
+                return
+        
+        close = getattr(connection, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+    
     def _display_popup_notification(self, notification_data: Dict[str, Any]) -> None:
         """
         Simulate popup notification display.
@@ -369,8 +503,14 @@ class NotificationSystem:
             self.logger.error(f"Failed to display popup notification: {str(e)}")
     
     def _process_notifications(self) -> None:
-        """Background thread to process notification queue."""
-        while True:
+        """
+        Background thread to process notification queue.
+        
+        Whatever has queued up behind the first notification is drained and
+        stored together, so bursts of scans cost one storage pass per batch.
+        """
+        running = True
+        while running:
             try:
                 # Get notification from queue (blocking)
                 notification = self.notification_queue.get()
@@ -378,14 +518,30 @@ class NotificationSystem:
                 if notification is None:  # Shutdown signal
                     break
                 
-                # Process the notification
-                self._handle_notification(notification)
+                batch = [notification]
+                while len(batch) < self.store_batch_size:
+                    try:
+                        notification = self.notification_queue.get_nowait()
+                    except Empty:
+                        break
+                    
+                    if notification is None:  # Shutdown after this batch
+                        running = False
+                        break
+                    
+                    batch.append(notification)
                 
-                # Mark task as done
-                self.notification_queue.task_done()
+                # Store and process the notifications
+                self._store_notifications(batch)
+                for notification in batch:
+                    self._handle_notification(notification)
             
             except Exception as e:
                 self.logger.error(f"Error processing notification: {str(e)}")
+        
+        if self._store_file is not None:
+            self._store_file.close()
+            self._store_file = None
     
     def _handle_notification(self, notification: NotificationData) -> None:
         """
@@ -398,9 +554,6 @@ class NotificationSystem:
             # Log notification
             self.logger.info(f"Processing notification: {notification.title}")
             
-            # Store notification (in production, store in database)
-            self._store_notification(notification)
-            
             # Send email if recipient specified and configured
             if notification.recipient and self._is_email_configured():
                 self._send_email_notification(notification)
@@ -417,28 +570,40 @@ class NotificationSystem:
         except Exception as e:
             self.logger.error(f"Failed to handle notification {notification.id}: {str(e)}")
     
-    def _store_notification(self, notification: NotificationData) -> None:
+    def _store_notifications(self, notifications: List[NotificationData]) -> None:
         """
-        Store notification in database or file system.
+        Store a batch of notifications in database or file system.
+        
+        The batch is appended to today's NDJSON file with a single write.
         
         Args:
-            notification (NotificationData): Notification to store
+            notifications (List[NotificationData]): Notifications to store
         """
         try:
             # In production, this would store in the database
             # For now, we'll store in a simple file-based cache
             
-            notifications_dir = 'database/notifications'
-            os.makedirs(notifications_dir, exist_ok=True)
-            
-            filename = f"{notification.id}.json"
-            filepath = os.path.join(notifications_dir, filename)
+            date = today_str()
+            if self._store_date != date:
+                if not self._notifications_dir_ready:
+                    os.makedirs(self.notifications_dir, exist_ok=True)
+                    self._notifications_dir_ready = True
+                
+                if self._store_file is not None:
+                    self._store_file.close()
+                
+                filepath = os.path.join(self.notifications_dir, f"{date}.ndjson")
+                self._store_file = open(filepath, 'ab', buffering=1 << 20)
+                self._store_date = date
             
-            with open(filepath, 'w') as f:
-                json.dump(asdict(notification), f, indent=2)
+            self._store_file.write(b''.join(
+                _json_bytes(notification.to_dict()) + b'\n'
+                for notification in notifications
+            ))
+            self._store_file.flush()
             
         except Exception as e:
-            self.logger.error(f"Failed to store notification: {str(e)}")
+            self.logger.error(f"Failed to store notifications: {str(e)}")
     
     def _send_email_notification(self, notification: NotificationData) -> bool:
         """
@@ -464,9 +629,8 @@ class NotificationSystem:
             # Create email body using template
             template_name = notification.type
             if template_name in self.templates:
-                template = Template(self.templates[template_name])
-                body = template.render(
-                    notification=asdict(notification),
+                body = self.templates[template_name].render(
+                    notification=notification.to_dict(),
                     system_name="QR Code Attendance System"
                 )
             else:
@@ -483,14 +647,16 @@ class NotificationSystem:
             
             msg.attach(MIMEText(body, 'html' if template_name in self.templates else 'plain'))
             
-            # Send email
-            with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
-                if self.email_config['use_tls']:
-                    context = ssl.create_default_context()
-                    server.starttls(context=context)
-                
-                server.login(self.email_config['username'], self.email_config['password'])
-                server.send_message(msg)
+            # Send email over the shared session, reconnecting once if the
+            # connection itself was lost. Other SMTP errors (refused
+            # recipients, DATA failures) are not retried, so a message the
+            # server may have accepted is never sent twice
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                    self._close_smtp()
+                    self._get_smtp().send_message(msg)
             
             self.logger.info(f"Email notification sent to {notification.recipient}")
             return True
@@ -499,6 +665,43 @@ class NotificationSystem:
             self.logger.error(f"Failed to send email notification: {str(e)}")
             return False
     
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Get the shared SMTP session, connecting and logging in if needed.
+        
+        Must be called with self._smtp_lock held.
+        
+        Returns:
+            smtplib.SMTP: Authenticated SMTP session
+        """
+        if self._smtp is None:
+            server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
+            try:
+                if self.email_config['use_tls']:
+                    context = ssl.create_default_context()
+                    server.starttls(context=context)
+                
+                server.login(self.email_config['username'], self.email_config['password'])
+            except Exception:
+                server.close()
+                raise
+            
+            self._smtp = server
+        
+        return self._smtp
+    
+    def _close_smtp(self) -> None:
+        """Close the shared SMTP session. Must be called with self._smtp_lock held."""
+        if self._smtp is None:
+            return
+        
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        
+        self._smtp = None
+    
     def _is_email_configured(self) -> bool:
         """Check if email configuration is complete."""
         return all([
@@ -561,20 +764,18 @@ class NotificationSystem:
             List[Dict[str, Any]]: Recent notifications
         """
         try:
-            # Get from active notifications cache
-            recent_notifications = list(self.active_notifications.values())
-            
-            # Sort by creation time (newest first)
-            recent_notifications.sort(key=lambda x: x['created_at'], reverse=True)
-            
-            # Filter by user if specified
-            if user_id:
-                recent_notifications = [
-                    n for n in recent_notifications 
-                    if n.get('recipient') == user_id or n.get('recipient') is None
-                ]
-            
-            return recent_notifications[:limit]
+            with self._active_lock:
+                # The cache is kept in creation order, so walk it newest first
+                recent_notifications = reversed(self.active_notifications.values())
+                
+                # Filter by user if specified
+                if user_id:
+                    recent_notifications = (
+                        n for n in recent_notifications
+                        if n.get('recipient') == user_id or n.get('recipient') is None
+                    )
+                
+                return list(islice(recent_notifications, limit))
         
         except Exception as e:
             self.logger.error(f"Failed to get recent notifications: {str(e)}")
@@ -623,16 +824,83 @@ class NotificationSystem:
             'use_tls': use_tls
         })
         
+        # Reconnect with the new settings on the next email
+        with self._smtp_lock:
+            self._close_smtp()
+        
         self.logger.info("Email configuration updated")
     
+    def start_redis_listener(self, redis_client, channel: str = 'attendance') -> None:
+        """
+        Deliver attendance notifications published on a Redis channel.
+        
+        Web workers publish scans and return immediately; each process running
+        a listener pushes the messages to its own connected clients. The
+        publishing worker stores and processes the notification, so listeners
+        only broadcast. A dropped Redis connection is retried with backoff.
+        
+        Args:
+            redis_client: redis.Redis client instance
+            channel (str): Pub/sub channel carrying attendance payloads
+        """
+        def listen():
+            delay = 1
+            while True:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                try:
+                    pubsub.subscribe(channel)
+                    delay = 1
+                    
+                    for message in pubsub.listen():
+                        try:
+                            attendance_data = (orjson.loads if ORJSON_AVAILABLE else json.loads)(message['data'])
+                            self.send_attendance_notification(attendance_data, process=False)
+                        except Exception as e:
+                            self.logger.error(f"Failed to handle published notification: {str(e)}")
+                
+                except Exception as e:
+                    self.logger.error(f"Redis listener on '{channel}' lost its connection, retrying in {delay}s: {str(e)}")
+                
+                finally:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+                
+                sleep(delay)
+                delay = min(delay * 2, 60)
+        
+        self.redis_listener = threading.Thread(target=listen, daemon=True)
+        self.redis_listener.start()
+        
+        self.logger.info(f"Listening for notifications on Redis channel '{channel}'")
+    
     def add_websocket_connection(self, connection) -> None:
         """Add WebSocket connection for real-time updates."""
-        self.websocket_connections.add(connection)
+        outbox = Queue(maxsize=self.websocket_queue_size)
+        self.websocket_connections[connection] = outbox
+        
+        threading.Thread(
+            target=self._websocket_sender,
+            args=(connection, outbox),
+            daemon=True
+        ).start()
+        
         self.logger.info("WebSocket connection added")
     
     def remove_websocket_connection(self, connection) -> None:
         """Remove WebSocket connection."""
-        self.websocket_connections.discard(connection)
+        outbox = self.websocket_connections.pop(connection, None)
+        if outbox is None:
+            return
+        
+        # Wake an idle sender thread so it exits; a sender with a full queue
+        # sees the connection is gone after its current send
+        try:
+            outbox.put_nowait(None)
+        except Full:
+            pass
+        
         self.logger.info("WebSocket connection removed")
     
     def _get_attendance_scan_template(self) -> str:
@@ -769,7 +1037,11 @@ class NotificationSystem:
                 self.notification_processor.join(timeout=5)
             
             # Close WebSocket connections
-            self.websocket_connections.clear()
+            for connection in list(self.websocket_connections):
+                self.remove_websocket_connection(connection)
+            
+            with self._smtp_lock:
+                self._close_smtp()
             
             self.logger.info("Notification system shut down")
         
@@ -26,6 +26,11 @@ try:
     STYLED_QR_AVAILABLE = True
 except ImportError:
     STYLED_QR_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 import io
 import base64
 from PIL import Image, ImageDraw, ImageFont
@@ -38,6 +43,39 @@ import os
 import logging
 from typing import Optional, Dict, Any, List, Tuple
 
+def _render_monochrome_png(qr_data: str, version: int, error_correction: int,
+                           box_size: int, border: int) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Render a black-on-white QR code PNG straight from the module matrix.
+    
+    Args:
+        qr_data (str): Data to encode
+        version (int): Minimum QR version
+        error_correction (int): qrcode error correction constant
+        box_size (int): Pixels per module
+        border (int): Quiet zone width in modules
+    
+    Returns:
+        Tuple[bytes, Tuple[int, int]]: PNG bytes and image size
+    """
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=error_correction,
+        box_size=box_size,
+        border=border
+    )
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    
+    # Dark modules are True; scale each module up to a box_size square
+    modules = np.where(np.asarray(qr.get_matrix(), dtype=bool), 0, 255).astype(np.uint8)
+    pixels = np.kron(modules, np.ones((box_size, box_size), dtype=np.uint8))
+    img = Image.fromarray(pixels)
+    
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', optimize=False, compress_level=1)
+    return buffer.getvalue(), img.size
+
 class QRGenerator:
     """
     Comprehensive QR code generator for the attendance system.
@@ -159,38 +197,50 @@ class QRGenerator:
             if custom_settings:
                 settings.update(custom_settings)
             
-            # Create QR code instance
-            qr = qrcode.QRCode(
-                version=settings['version'],
-                error_correction=settings['error_correction'],
-                box_size=settings['box_size'],
-                border=settings['border']
-            )
-            
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-            
-            # Generate QR code image based on style
-            if style == 'styled' and 'module_drawer' in settings and STYLED_QR_AVAILABLE:
-                img = qr.make_image(
-                    image_factory=StyledPilImage,
-                    module_drawer=settings['module_drawer']
+            # Plain black-on-white codes skip PIL's per-module drawing
+            if (NUMPY_AVAILABLE and style == 'default'
+                    and settings['fill_color'] == 'black' and settings['back_color'] == 'white'):
+                png_bytes, image_size = _render_monochrome_png(
+                    qr_data,
+                    settings['version'],
+                    settings['error_correction'],
+                    settings['box_size'],
+                    settings['border']
                 )
             else:
-                img = qr.make_image(
-                    fill_color=settings['fill_color'],
-                    back_color=settings['back_color']
+                # Create QR code instance
+                qr = qrcode.QRCode(
+                    version=settings['version'],
+                    error_correction=settings['error_correction'],
+                    box_size=settings['box_size'],
+                    border=settings['border']
                 )
-            
-            # Add student information overlay if requested
-            if style == 'with_info':
-                img = self._add_student_info_overlay(img, student_data)
+                
+                qr.add_data(qr_data)
+                qr.make(fit=True)
+                
+                # Generate QR code image based on style
+                if style == 'styled' and 'module_drawer' in settings and STYLED_QR_AVAILABLE:
+                    img = qr.make_image(
+                        image_factory=StyledPilImage,
+                        module_drawer=settings['module_drawer']
+                    )
+                else:
+                    img = qr.make_image(
+                        fill_color=settings['fill_color'],
+                        back_color=settings['back_color']
+                    )
+                
+                # Add student information overlay if requested
+                if style == 'with_info':
+                    img = self._add_student_info_overlay(img, student_data)
+                
+                buffer = io.BytesIO()
+                img.save(buffer, format='PNG')
+                png_bytes, image_size = buffer.getvalue(), img.size
             
             # Convert image to base64 string
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            img_base64 = base64.b64encode(png_bytes).decode()
             
             # Generate filename
             filename = f"qr_{student_data['student_id']}_{datetime.now().strftime('%Y%m%d')}.png"
@@ -199,7 +249,7 @@ class QRGenerator:
                 'success': True,
                 'qr_data': qr_data,
                 'image_base64': img_base64,
-                'image_size': img.size,
+                'image_size': image_size,
                 'filename': filename,
                 'student_id': student_data['student_id'],
                 'generated_at': datetime.now().isoformat()
@@ -19,9 +19,10 @@ Features:
 """
 
 from datetime import datetime, timedelta, time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import logging
 from dataclasses import dataclass
+from app.modules.date_utils import today_str
 
 @dataclass
 class RoomAssignment:
@@ -51,14 +52,18 @@ class RoomManager:
     Handles all aspects of room administration, scheduling, and analytics.
     """
     
-    def __init__(self, database_manager):
+    def __init__(self, database_manager,
+                 on_room_changed: Optional[Callable[[int], None]] = None):
         """
         Initialize the room manager with database connection.
         
         Args:
             database_manager: Database manager instance
+            on_room_changed (Callable): Called with the room ID after a room is
+                edited or removed, so cached lookups can be dropped
         """
         self.db = database_manager
+        self.on_room_changed = on_room_changed
         self.logger = logging.getLogger(__name__)
         
         # Room types
@@ -84,8 +89,23 @@ class RoomManager:
             6: 'Sunday'
         }
         
+        # Incremented whenever the rooms table changes, so cached room lists
+        # can be keyed on it
+        self.rooms_version = 0
+        
         self.logger.info("Room manager initialized")
     
+    def _bump_version(self, room_id: Optional[int] = None) -> None:
+        """
+        Mark cached room lists as stale after a rooms table change.
+        
+        Args:
+            room_id (int): Existing room that was edited or removed, if any
+        """
+        self.rooms_version += 1
+        if room_id is not None and self.on_room_changed is not None:
+            self.on_room_changed(room_id)
+    
     def create_room(self, room_code: str, room_name: str, building: str = None,
                    floor: int = None, capacity: int = 0, room_type: str = 'classroom',
                    created_by: int = None) -> Dict[str, Any]:
@@ -130,13 +150,14 @@ class RoomManager:
                 room_type = self.ROOM_TYPES['CLASSROOM']
             
             # Insert new room
-            room_id = self.db.execute_update(
+            room_id = self.db.execute_insert(
                 """INSERT INTO rooms (room_code, room_name, building, floor, 
                                     capacity, room_type, created_at, updated_at)
                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
                 (room_code, room_name, building, floor, capacity, room_type)
             )
             
+            self._bump_version()
             self.logger.info(f"Room created successfully: {room_code} (ID: {room_id})")
             
             return {
@@ -211,9 +232,10 @@ class RoomManager:
             
             # Execute update
             query = f"UPDATE rooms SET {', '.join(update_fields)} WHERE id = ?"
-            affected_rows = self.db.execute_update(query, params)
+            affected_rows = self.db.execute_modify(query, params)
             
             if affected_rows > 0:
+                self._bump_version(room_id)
                 self.logger.info(f"Room {room_id} updated successfully")
                 return {
                     'success': True,
@@ -253,18 +275,19 @@ class RoomManager:
             
             if has_attendance:
                 # Soft delete - mark as inactive
-                affected_rows = self.db.execute_update(
+                affected_rows = self.db.execute_modify(
                     "UPDATE rooms SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                     (room_id,)
                 )
             else:
                 # Hard delete if no attendance records
-                affected_rows = self.db.execute_update(
+                affected_rows = self.db.execute_modify(
                     "DELETE FROM rooms WHERE id = ?",
                     (room_id,)
                 )
             
             if affected_rows > 0:
+                self._bump_version(room_id)
                 self.logger.info(f"Room {room_id} deleted by user {deleted_by}")
                 return True
             
@@ -482,7 +505,7 @@ class RoomManager:
                 }
             
             # Create assignment
-            assignment_id = self.db.execute_update(
+            assignment_id = self.db.execute_insert(
                 """INSERT INTO room_assignments 
                    (professor_id, room_id, subject_id, day_of_week, start_time, end_time)
                    VALUES (?, ?, ?, ?, ?, ?)""",
@@ -516,7 +539,7 @@ class RoomManager:
             bool: Success status
         """
         try:
-            affected_rows = self.db.execute_update(
+            affected_rows = self.db.execute_modify(
                 "UPDATE room_assignments SET is_active = 0 WHERE id = ?",
                 (assignment_id,)
             )
@@ -566,7 +589,7 @@ class RoomManager:
             List[Dict[str, Any]]: Room occupancy data
         """
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = today_str()
             
             return self.db.execute_query(
                 """SELECT r.id, r.room_name, r.room_code, r.capacity, r.building,
@@ -721,7 +744,8 @@ class RoomManager:
             results = self.db.execute_query(
                 """SELECT DISTINCT building FROM rooms 
                    WHERE building IS NOT NULL AND is_active = 1 
-                   ORDER BY building"""
+                   ORDER BY building""",
+                as_dict=False
             )
             return [r['building'] for r in results]
         
@@ -19,7 +19,7 @@ Features:
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import logging
 import re
 import csv
@@ -49,14 +49,19 @@ class StudentManager:
     Handles all aspects of student administration and data management.
     """
     
-    def __init__(self, database_manager):
+    def __init__(self, database_manager,
+                 on_student_changed: Optional[Callable[[Optional[str]], None]] = None):
         """
         Initialize the student manager with database connection.
         
         Args:
             database_manager: Database manager instance
+            on_student_changed (Callable): Called with the student number (or
+                None for any student) after a student is edited or removed, so
+                cached lookups can be dropped
         """
         self.db = database_manager
+        self.on_student_changed = on_student_changed
         self.qr_generator = QRGenerator()
         self.logger = logging.getLogger(__name__)
         
@@ -141,7 +146,7 @@ class StudentManager:
             qr_code = self._generate_unique_qr_code(student_data['student_id'])
             
             # Insert new student
-            student_id = self.db.execute_update(
+            student_id = self.db.execute_insert(
                 """INSERT INTO students (student_id, first_name, last_name, middle_name,
                                        department, year_level, section, email, phone, qr_code,
                                        created_at, updated_at)
@@ -192,6 +197,11 @@ class StudentManager:
                 'error': 'Failed to create student record'
             }
     
+    def _student_changed(self, student_number: Optional[str]) -> None:
+        """Notify the change listener that a student row was modified."""
+        if self.on_student_changed is not None:
+            self.on_student_changed(student_number)
+    
     def update_student(self, student_id: int, update_data: Dict[str, Any],
                       updated_by: int = None) -> Dict[str, Any]:
         """
@@ -276,9 +286,10 @@ class StudentManager:
             
             # Execute update
             query = f"UPDATE students SET {', '.join(update_fields)} WHERE id = ?"
-            affected_rows = self.db.execute_update(query, params)
+            affected_rows = self.db.execute_modify(query, params)
             
             if affected_rows > 0:
+                self._student_changed(existing_student['student_id'])
                 self.logger.info(f"Student {student_id} updated successfully")
                 return {
                     'success': True,
@@ -318,18 +329,19 @@ class StudentManager:
             
             if has_attendance:
                 # Soft delete - mark as inactive
-                affected_rows = self.db.execute_update(
+                affected_rows = self.db.execute_modify(
                     "UPDATE students SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                     (student_id,)
                 )
             else:
                 # Hard delete if no attendance records
-                affected_rows = self.db.execute_update(
+                affected_rows = self.db.execute_modify(
                     "DELETE FROM students WHERE id = ?",
                     (student_id,)
                 )
             
             if affected_rows > 0:
+                self._student_changed(None)
                 self.logger.info(f"Student {student_id} deleted by user {deleted_by}")
                 return True
             
@@ -534,7 +546,7 @@ class StudentManager:
             late_rate = (late_count / total_scans * 100) if total_scans > 0 else 0
             
             # Get unique rooms visited
-            unique_rooms = len(set(r['room_id'] for r in attendance_records))
+            unique_rooms = len({r['room_id'] for r in attendance_records})
             
             # Get recent activity
             recent_activity = attendance_records[:10]
@@ -590,12 +602,14 @@ class StudentManager:
             new_qr_code = self._generate_unique_qr_code(student['student_id'])
             
             # Update database
-            affected_rows = self.db.execute_update(
+            affected_rows = self.db.execute_modify(
                 "UPDATE students SET qr_code = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (new_qr_code, student_id)
             )
             
             if affected_rows > 0:
+                self._student_changed(student['student_id'])
+                
                 # Generate QR code image
                 qr_result = self.qr_generator.generate_student_qr_code(
                     {
@@ -853,7 +867,8 @@ class StudentManager:
             results = self.db.execute_query(
                 """SELECT DISTINCT department FROM students 
                    WHERE is_active = 1 AND department IS NOT NULL 
-                   ORDER BY department"""
+                   ORDER BY department""",
+                as_dict=False
             )
             return [r['department'] for r in results]
         
@@ -21,15 +21,21 @@ class QRAttendanceSystem {
             
             try {
                 this.wsConnection = new WebSocket(wsUrl);
+                this.wsConnection.binaryType = 'arraybuffer';
                 
                 this.wsConnection.onopen = () => {
                     console.log('WebSocket connected');
                     this.showNotification('System Connected', 'Real-time updates enabled', 'success');
                 };
                 
-                this.wsConnection.onmessage = (event) => {
-                    const data = JSON.parse(event.data);
-                    this.handleWebSocketMessage(data);
+                this.wsConnection.onmessage = async (event) => {
+                    // Broadcasts arrive as zlib-compressed binary frames
+                    const text = typeof event.data === 'string'
+                        ? event.data
+                        : await new Response(
+                            new Blob([event.data]).stream().pipeThrough(new DecompressionStream('deflate'))
+                        ).text();
+                    this.handleWebSocketMessage(JSON.parse(text));
                 };
                 
                 this.wsConnection.onclose = () => {
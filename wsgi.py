@@ -0,0 +1,24 @@
+"""
+WSGI Entry Point - Flask QR Code Attendance System
+Author: GitHub Copilot
+Date: September 2025
+
+Exposes the Flask application to WSGI servers such as gunicorn:
+
+    gunicorn -w 4 --preload -b 0.0.0.0:5000 wsgi:app
+
+app.py cannot be imported as ``app`` because the ``app`` package shadows it,
+so it is loaded here by path.
+"""
+
+import importlib.util
+import os
+import sys
+
+_app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+_spec = importlib.util.spec_from_file_location('scanme_app', _app_path)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules['scanme_app'] = _module
+_spec.loader.exec_module(_module)
+
+app = _module.app